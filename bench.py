@@ -0,0 +1,540 @@
+# bench.py – Micro-benchmarks for the Smart Expense Tracker storage layer.
+# Every benchmark runs against a throwaway database, never resources/data.db.
+
+import argparse
+import inspect
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.periods import date_key, month_bounds
+from database import ExpenseDatabase, from_cents, set_db, to_cents
+from migrations import migrate
+
+def _timed(fn, n: int) -> float:
+    """Run fn(i) n times and return operations per second."""
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+def bench_add_expense(n: int = 2000) -> None:
+    """
+    Compare add_expense throughput with a fresh connection per operation
+    (the old behaviour, including the extra connect for last_insert_rowid)
+    against the pooled connection layer.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        row = {"date": "2025-01-01", "amount": -1.0, "category": "Bench",
+               "description": "", "type": "expense"}
+        db.add_transaction(row)
+
+        def connect_per_op(i: int) -> None:
+            with sqlite3.connect(db.db_path) as conn:
+                conn.execute(
+                    "INSERT INTO transactions(date, amount, category_id, description, type) "
+                    "SELECT ?, ?, id, ?, ? FROM categories WHERE name = ?",
+                    ("2025-01-01", -100, f"row {i}", "expense", "Bench")
+                )
+            conn.close()
+            with sqlite3.connect(db.db_path) as conn:
+                conn.execute("SELECT last_insert_rowid()").fetchone()
+            conn.close()
+
+        def pooled(i: int) -> None:
+            db.add_transaction({**row, "description": f"row {i}"})
+
+        before = _timed(connect_per_op, n)
+        after = _timed(pooled, n)
+        db.close()
+    print(f"add_expense x{n}: connect-per-op {before:,.0f} ops/s, "
+          f"pooled {after:,.0f} ops/s ({after / before:.1f}x)")
+
+# Queries issued by the reports, with the index each one must use.
+REPORT_QUERIES = [
+    ("SELECT * FROM transactions WHERE date_key>=? AND date_key<=? ORDER BY id ASC",
+     (20250101, 20250131), "idx_transactions_date_key"),
+    ("SELECT type, SUM(total) FROM monthly_category_totals "
+     "WHERE month>=? AND month<=? GROUP BY type",
+     ("2025-01", "2025-01"), "PRIMARY KEY"),
+    ("SELECT * FROM transactions WHERE date_key>=? AND date_key<=? AND category_id IN "
+     "(SELECT id FROM categories WHERE name IN (?)) ORDER BY id ASC",
+     (20250101, 20250131, "Food"), "idx_transactions_category_date_key"),
+    ("SELECT SUM(total) FROM monthly_category_totals "
+     "WHERE category=? AND type='expense'",
+     ("Food",), "idx_rollup_category_type_month"),
+]
+
+def bench_query_plans() -> None:
+    """Check with EXPLAIN QUERY PLAN that report queries are index searches, not scans."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        for sql, params, index in REPORT_QUERIES:
+            plan = db.explain(sql, params)
+            print(f"{sql}\n    " + "\n    ".join(plan))
+            assert any(index in step for step in plan), f"{index} not used"
+        db.close()
+
+def _synthetic_rows(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    cats = ["Food", "Rent", "Travel", "Salary", "Gifts", "Books", "Fuel", "Health"]
+    rows = []
+    for i in range(n):
+        typ = "income" if rng.random() < 0.2 else "expense"
+        amount = round(rng.uniform(1, 500), 2)
+        rows.append((
+            f"{rng.randint(2020, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            amount if typ == "income" else -amount, rng.choice(cats), f"row {i}", typ
+        ))
+    return rows
+
+def _reference_category_report(df: pd.DataFrame) -> pd.DataFrame:
+    """The original pandas implementation of generate_category_report."""
+    df = df.astype({"category": str, "type": str})
+    def pivot_and_format(category_type: str) -> pd.DataFrame:
+        sub_df = df[df["type"] == category_type]
+        return sub_df.groupby("category")["amount"].sum().reset_index().rename(
+            columns={"amount": category_type}
+        )
+    merged = pd.merge(pivot_and_format("income"), pivot_and_format("expense"),
+                      on="category", how="outer").fillna(0)
+    merged["net"] = merged["income"] + merged["expense"]
+    return merged[["category", "income", "expense", "net"]]
+
+def bench_reports(n: int = 200000) -> None:
+    """Differential check and timing of the SQL reports against the original pandas code."""
+    from core import reports
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        db.add_transactions(_synthetic_rows(n))
+        previous = set_db(db)
+        months = [f"{y}-{m:02d}" for y in range(2020, 2026) for m in range(1, 13)]
+        start = time.perf_counter()
+        for month in months:
+            df = db.get_transactions(*month_bounds(month))
+            expected = _reference_category_report(df)
+            income = df[df["type"] == "income"]["amount"].sum()
+            expense = df[df["type"] == "expense"]["amount"].sum()
+        pandas_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for month in months:
+            got = reports.generate_category_report(month)
+            summary = reports.generate_monthly_report(month)
+        sql_time = time.perf_counter() - start
+        for month in months:
+            df = db.get_transactions(*month_bounds(month))
+            pd.testing.assert_frame_equal(
+                reports.generate_category_report(month), _reference_category_report(df)
+            )
+            summary = reports.generate_monthly_report(month)
+            assert math.isclose(summary["income"], df[df["type"] == "income"]["amount"].sum())
+            assert math.isclose(summary["expense"], df[df["type"] == "expense"]["amount"].sum())
+        set_db(previous)
+        db.close()
+    print(f"{len(months)} monthly+category reports over {n:,} rows: "
+          f"pandas {pandas_time:.2f}s, SQL {sql_time:.2f}s; outputs match")
+
+def bench_date_ranges(n: int = 1000000) -> None:
+    """Time month range queries on the TEXT date column against the integer date_key."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        db.add_transactions(_synthetic_rows(n))
+        with db._get_conn() as conn:
+            conn.execute("CREATE INDEX idx_bench_text_date ON transactions(date)")
+            conn.execute("ANALYZE")
+        months = [f"{y}-{m:02d}" for y in range(2020, 2026) for m in range(1, 13)]
+        bounds = [month_bounds(month) for month in months]
+        conn = db._get_conn()
+        timings = {}
+        for label, sql, convert in [
+            ("TEXT date", "SELECT COUNT(*), SUM(amount) FROM transactions "
+                          "INDEXED BY idx_bench_text_date WHERE date>=? AND date<=?", str),
+            ("INTEGER date_key", "SELECT COUNT(*), SUM(amount) FROM transactions "
+                                 "INDEXED BY idx_transactions_date_key "
+                                 "WHERE date_key>=? AND date_key<=?", date_key),
+        ]:
+            params = [(convert(start), convert(end)) for start, end in bounds]
+            start = time.perf_counter()
+            for _ in range(5):
+                results = [conn.execute(sql, p).fetchone() for p in params]
+            timings[label] = time.perf_counter() - start
+            assert sum(r[0] for r in results) == n
+        db.close()
+    print(f"{len(months) * 5} month range queries over {n:,} rows: " +
+          ", ".join(f"{label} {secs:.2f}s" for label, secs in timings.items()))
+
+def bench_categories(n: int = 1000000) -> None:
+    """Database size and DataFrame memory with TEXT categories versus the categories table."""
+    rows = _synthetic_rows(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        conn = sqlite3.connect(path)
+        migrate(conn, target=4)  # last schema with category stored as TEXT
+        with conn:
+            conn.executemany("INSERT INTO transactions(date, amount, category, description, type) "
+                             "VALUES(?,?,?,?,?)", rows)
+        conn.execute("VACUUM")
+        text_size = path.stat().st_size
+        start = time.perf_counter()
+        text_df = pd.read_sql("SELECT * FROM transactions", conn, parse_dates=["date"])
+        text_read = time.perf_counter() - start
+        migrate(conn, target=5)  # the categories table alone; amounts stay REAL
+        conn.execute("VACUUM")
+        conn.close()
+        int_size = path.stat().st_size
+        db = ExpenseDatabase(str(path))
+        start = time.perf_counter()
+        cat_df = db.get_transactions()
+        cat_read = time.perf_counter() - start
+        db.close()
+    timings = []
+    for df in (text_df, cat_df):
+        start = time.perf_counter()
+        for _ in range(10):
+            df.groupby("category", observed=True)["amount"].sum()
+        timings.append(time.perf_counter() - start)
+    mem = [df[["category", "type"]].memory_usage(deep=True).sum() / 2**20 for df in (text_df, cat_df)]
+    print(f"{n:,} rows: database {text_size / 2**20:.1f} MiB -> {int_size / 2**20:.1f} MiB; "
+          f"category+type columns {mem[0]:.1f} MiB -> {mem[1]:.1f} MiB; "
+          f"read {text_read:.2f}s -> {cat_read:.2f}s; "
+          f"10x groupby(category) {timings[0]:.2f}s -> {timings[1]:.2f}s")
+
+def bench_export(n: int = 10000000) -> None:
+    """Streamed CSV export of an n-row ledger: time and peak Python memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        batch = _synthetic_rows(min(n, 1000000))
+        for start in range(0, n, len(batch)):
+            db.add_transactions(batch[:n - start])
+        results = []
+        for name in ("export.csv", "export.csv.gz"):
+            start = time.perf_counter()
+            written = db.export_to_csv(str(Path(tmp) / name))
+            elapsed = time.perf_counter() - start
+            size = (Path(tmp) / name).stat().st_size
+            results.append(f"{name} {elapsed:.1f}s ({n / elapsed:,.0f} rows/s), {size / 2**20:.0f} MiB")
+            assert written == n
+        # Separate pass: tracemalloc slows allocation-heavy code considerably.
+        tracemalloc.start()
+        db.export_to_csv(str(Path(tmp) / "export.csv"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append(f"peak Python memory {peak / 2**20:.1f} MiB")
+        db.close()
+    print(f"export of {n:,} rows: " + "; ".join(results))
+
+def bench_columnar(n: int = 1000000) -> None:
+    """
+    Reload one year of an n-row ledger from CSV, Parquet and memory-mapped Arrow,
+    then check that importing each columnar export reproduces the SQLite source.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.ipc
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        db.add_transactions(_synthetic_rows(n))
+        db.delete_transaction(1)  # leave an id gap that must survive the round trip
+        db.set_budget("Food", 400.0)
+        db.set_budget("Rent", 1200.0)
+        csv_path = Path(tmp) / "2024.csv"
+        db.export_to_csv(str(csv_path), start_date="2024-01-01", end_date="2024-12-31")
+        db.export_parquet(str(Path(tmp) / "parquet"))
+        db.export_arrow(str(Path(tmp) / "arrow"))
+
+        columns = ["id", "date", "amount", "category", "type"]  # the CSV export's columns
+        def read_csv() -> int:
+            return len(pd.read_csv(csv_path, parse_dates=["date"],
+                                   dtype={"category": "category", "type": "category"}))
+        def read_parquet() -> int:
+            dataset = ds.dataset(Path(tmp) / "parquet" / "transactions",
+                                 format="parquet", partitioning="hive")
+            return len(dataset.to_table(columns, filter=ds.field("year") == 2024).to_pandas())
+        def read_arrow() -> int:
+            with pa.memory_map(str(Path(tmp) / "arrow" / "transactions.arrow")) as source:
+                table = pa.ipc.open_file(source).read_all().select(columns)
+                year = pa.compute.year(table["date"])
+                return len(table.filter(pa.compute.equal(year, 2024)).to_pandas())
+        timings = {}
+        for label, fn in [("CSV", read_csv), ("Parquet", read_parquet), ("Arrow mmap", read_arrow)]:
+            start = time.perf_counter()
+            rows = fn()
+            timings[label] = time.perf_counter() - start
+        expected = len(db.query_transactions(start_date="2024-01-01", end_date="2024-12-31"))
+        assert rows == expected, (rows, expected)
+
+        for fmt in ("parquet", "arrow"):
+            copy = ExpenseDatabase(str(Path(tmp) / f"{fmt}.db"))
+            getattr(copy, f"import_{fmt}")(str(Path(tmp) / fmt), replace=True)
+            pd.testing.assert_frame_equal(copy.get_transactions(), db.get_transactions())
+            pd.testing.assert_frame_equal(copy.get_budgets(), db.get_budgets())
+            assert copy.check_rollup().empty
+            copy.close()
+        db.close()
+    print(f"reload one year ({rows:,} rows) of {n:,}: " +
+          ", ".join(f"{label} {secs:.3f}s" for label, secs in timings.items()) +
+          "; Parquet and Arrow round trips match")
+
+def bench_charts(n: int = 200000) -> None:
+    """
+    Render two years of monthly chart packs with the interactive vis.py
+    functions (pyplot figure per chart, reports recomputed per chart) and
+    with render_chart_pack; both headless on Agg.
+    """
+    import warnings
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import vis
+    from core.cache import report_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        db.add_transactions(_synthetic_rows(n))
+        for category, limit in [("Food", 1500.0), ("Rent", 4000.0), ("Travel", 2000.0)]:
+            db.set_budget(category, limit)
+        previous = set_db(db)
+        report_cache.clear()
+        months = [f"{y}-{m:02d}" for y in (2024, 2025) for m in range(1, 13)]
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Agg's plt.show() and seaborn palette warnings
+            for month in months:
+                for name, fn, arg in [("summary", vis.plot_monthly_summary, month),
+                                      ("category", vis.plot_category_spending, month),
+                                      ("budget", vis.plot_budget_status, month),
+                                      ("trend", vis.plot_monthly_trend, month[:4])]:
+                    fn(arg)
+                    plt.savefig(Path(tmp) / f"old-{month}-{name}.png")
+                    plt.close("all")
+        before = time.perf_counter() - start
+        set_db(previous)
+        start = time.perf_counter()
+        written = vis.render_chart_pack(str(Path(tmp) / "pack"), months[0], months[-1], db=db)
+        after = time.perf_counter() - start
+        db.close()
+    print(f"{len(months)} months of charts over {n:,} rows: pyplot+seaborn per chart "
+          f"{before:.1f}s ({len(months) * 4} files), batch renderer {after:.1f}s "
+          f"({len(written)} files)")
+
+def bench_ledgers(n: int = 400000, shards: int = 4) -> None:
+    """
+    Split n rows over several ledgers and check cross_ledger_category_report,
+    inline and on a pool with a worker process per ledger, against
+    generate_category_report on one database holding all the rows.
+    """
+    from core.ledgers import LedgerRegistry
+    from core.reports import cross_ledger_category_report, generate_category_report
+    rows = _synthetic_rows(n)
+    months = [f"{y}-{m:02d}" for y in range(2020, 2026) for m in range(1, 13)]
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = LedgerRegistry(str(Path(tmp) / "ledgers"))
+        for i in range(shards):
+            registry.register(f"team{i}")
+            registry.open(f"team{i}").add_transactions(rows[i::shards])
+        whole = ExpenseDatabase(str(Path(tmp) / "whole.db"))
+        whole.add_transactions(rows)
+        timings = {}
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(shards, mp_context=ctx) as pool:
+            pool.submit(int).result()  # start the workers before timing
+            for workers, executor in ((1, None), (shards, pool)):
+                start = time.perf_counter()
+                for month in months:
+                    got = cross_ledger_category_report(month, workers=workers, registry=registry,
+                                                       executor=executor)
+                    expected = generate_category_report(month, db=whole)
+                    pd.testing.assert_frame_equal(got, expected, check_exact=True)
+                timings[workers] = time.perf_counter() - start
+        registry.close_all()
+        whole.close()
+    print(f"{len(months)} cross-ledger category reports over {shards} ledgers, {n:,} rows: "
+          f"inline {timings[1]:.2f}s, {shards} workers {timings[shards]:.2f}s; "
+          f"outputs match the single-database report")
+
+def _report_pass(db, months: list) -> dict:
+    """Every monthly, category and budget report for months plus the yearly trends."""
+    from core import reports
+    from core.cache import report_cache
+    report_cache.clear()
+    out = {}
+    for month in months:
+        out["monthly", month] = reports.generate_monthly_report(month, db=db)
+        out["category", month] = reports.generate_category_report(month, db=db)
+        out["budget", month] = reports.generate_budget_report(month, db=db)
+    for year in sorted({m[:4] for m in months}):
+        out["trend", year] = reports.get_monthly_trend(year, db=db)
+    return out
+
+def bench_snapshot(n: int = 10000000) -> None:
+    """
+    Report pass over six years of months on SQLite (monthly rollup) and on an
+    in-memory LedgerSnapshot of the same ledger, at n // 10 and n rows, with
+    a differential check of every report.
+    """
+    months = [f"{y}-{m:02d}" for y in range(2020, 2026) for m in range(1, 13)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ExpenseDatabase(str(Path(tmp) / "bench.db"))
+        for category, limit in [("Food", 1500.0), ("Rent", 4000.0), ("Travel", 2000.0)]:
+            db.set_budget(category, limit)
+        batch = _synthetic_rows(min(n // 10, 1000000))
+        loaded = 0
+        for size in (n // 10, n):
+            while loaded < size:
+                loaded += len(db.add_transactions(batch[:size - loaded]))
+            start = time.perf_counter()
+            expected = _report_pass(db, months)
+            sql_time = time.perf_counter() - start
+            start = time.perf_counter()
+            snapshot = db.snapshot()
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            got = _report_pass(snapshot, months)
+            snapshot_time = time.perf_counter() - start
+            for key, value in expected.items():
+                if isinstance(value, dict):
+                    assert got[key] == value, key
+                else:
+                    pd.testing.assert_frame_equal(got[key], value, check_exact=True)
+            print(f"{len(expected)} reports over {size:,} rows: SQLite {sql_time:.2f}s; "
+                  f"snapshot load {load_time:.1f}s ({snapshot.nbytes / 2**20:.0f} MiB), "
+                  f"reports {snapshot_time:.2f}s; outputs match")
+            del snapshot
+        db.close()
+
+def bench_cents(n: int = 1000000) -> None:
+    """
+    Integer cents against REAL amounts: exactness of the stored totals,
+    SUM() in SQLite and numpy, and the time to migrate an n-row database.
+    """
+    rows = _synthetic_rows(n)
+    exact = {t: sum(to_cents(r[1]) for r in rows if r[4] == t) for t in ("income", "expense")}
+    drift = abs(sum(r[1] for r in rows if r[4] == "expense") - from_cents(exact["expense"]))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        conn = sqlite3.connect(path)
+        migrate(conn, target=6)  # last schema with REAL amounts
+        with conn:
+            conn.executemany("INSERT INTO categories(name) VALUES(?)",
+                             [(c,) for c in sorted({r[2] for r in rows})])
+            ids = dict(conn.execute("SELECT name, id FROM categories"))
+            conn.executemany("INSERT INTO transactions(date, amount, category_id, description, type) "
+                             "VALUES(?,?,?,?,?)", [(d, a, ids[c], desc, t) for d, a, c, desc, t in rows])
+        conn.execute("CREATE TABLE real_amounts AS SELECT amount FROM transactions")
+        start = time.perf_counter()
+        migrate(conn)
+        migrate_time = time.perf_counter() - start
+        conn.close()
+        db = ExpenseDatabase(str(path))
+        totals = db.sum_by_type()
+        assert totals == {t: from_cents(cents) for t, cents in exact.items()}, totals
+        assert db.check_rollup().empty
+        conn = db._get_conn()
+        conn.execute("CREATE TABLE cent_amounts AS SELECT amount FROM transactions")
+        sql_times = {}
+        for label, table in (("REAL", "real_amounts"), ("INTEGER", "cent_amounts")):
+            sql = f"SELECT SUM(amount) FROM {table}"
+            start = time.perf_counter()
+            for _ in range(10):
+                conn.execute(sql).fetchone()
+            sql_times[label] = (time.perf_counter() - start) / 10
+        cents = np.array([to_cents(r[1]) for r in rows], dtype=np.int64)
+        floats = cents / 100
+        np_times = {}
+        for label, values in (("float64", floats), ("int64", cents)):
+            start = time.perf_counter()
+            for _ in range(100):
+                values.sum()
+            np_times[label] = (time.perf_counter() - start) / 100
+        db.close()
+    print(f"{n:,} rows: float expense total drifts {drift:.2e} from the exact cents total; "
+          f"stored totals exact; migration to cents {migrate_time:.1f}s; "
+          f"SQLite SUM REAL {sql_times['REAL'] * 1e3:.0f}ms, INTEGER {sql_times['INTEGER'] * 1e3:.0f}ms; "
+          f"numpy sum float64 {np_times['float64'] * 1e3:.2f}ms, int64 {np_times['int64'] * 1e3:.2f}ms")
+
+# Cumulative import time budgets in seconds, ~1.5x the measured times; pandas
+# accounts for most of it. Eager matplotlib/seaborn put vis and main near 1.3s.
+IMPORT_BUDGETS = {
+    "database": 0.8,
+    "core.tracker": 0.8,
+    "core.budget": 0.8,
+    "core.reports": 0.8,
+    "vis": 0.8,
+    "main": 0.8,
+}
+# Must not be imported until a chart is drawn.
+DEFERRED_MODULES = ("matplotlib", "seaborn")
+
+def _import_time(module: str, cwd: str) -> float:
+    """Import module in a fresh interpreter and return its cumulative -X importtime in seconds."""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent),
+           "QT_QPA_PLATFORM": "offscreen"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True)
+    loaded = proc.stdout.strip()
+    assert not loaded, f"importing {module} loaded {loaded}"
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"no importtime entry for {module}")
+
+def bench_import_time(runs: int = 5) -> None:
+    """
+    Best-of-runs cold import time of each entry point against IMPORT_BUDGETS.
+    Also fails if an import creates the database or loads a plotting library.
+    """
+    results = []
+    for module, budget in IMPORT_BUDGETS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            best = min(_import_time(module, tmp) for _ in range(runs))
+            assert not (Path(tmp) / "resources").exists(), f"importing {module} created the database"
+        results.append(f"{module} {best:.2f}s")
+        assert best <= budget, f"import {module} took {best:.2f}s, budget {budget:.2f}s"
+    print("import time (best of %d): %s; all within budget" % (runs, ", ".join(results)))
+
+BENCHMARKS = {
+    "add_expense": bench_add_expense,
+    "query_plans": bench_query_plans,
+    "reports": bench_reports,
+    "date_ranges": bench_date_ranges,
+    "categories": bench_categories,
+    "export": bench_export,
+    "columnar": bench_columnar,
+    "import_time": bench_import_time,
+    "charts": bench_charts,
+    "ledgers": bench_ledgers,
+    "snapshot": bench_snapshot,
+    "cents": bench_cents,
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Storage layer benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("-n", "--rows", type=int, help="override the row count of benchmarks that take one")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        fn = BENCHMARKS[name]
+        # Only row-count benchmarks take -n; others (e.g. import_time's runs) keep their defaults.
+        sized = args.rows and "n" in inspect.signature(fn).parameters
+        fn(**({"n": args.rows} if sized else {}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import logging
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from database import ExpenseDatabase, from_cents, to_cents
+from core.events import (
+    BUDGET_CHANGED, BUDGET_REMOVED, LEDGER_CHANGED, TRANSACTIONS_ADDED, TRANSACTIONS_REMOVED,
+    events
+)
+from core.ledgers import DbArg, resolve_db, same_db
+
+log = logging.getLogger(__name__)
+
+# Called with category, month, spent, limit and threshold keywords.
+AlertCallback = Callable[..., None]
+
+class BudgetAlertEngine:
+    """
+    Month-to-date spending per category held in memory, seeded once from the
+    rollup and then updated in O(1) per transaction event, in integer cents.
+    Callbacks fire
+    when a category's spending crosses a threshold fraction of its budget
+    (by default 80% and 100%), at the moment the write happens. Events from
+    other databases (ledgers) are ignored.
+    """
+    def __init__(self,
+                 db:         DbArg=None,
+                 thresholds: Sequence[float]=(0.8, 1.0),
+                 month:      Optional[str]=None,
+                 today:      Callable[[], date]=date.today):
+        self.db = resolve_db(db)
+        self.thresholds = sorted(thresholds)
+        self.month: Optional[str] = None
+        self._fixed_month = month  # None follows the calendar month
+        self._today = today
+        self._spent: Dict[str, int] = {}  # cents
+        self._limits: Dict[str, int] = {}
+        self._callbacks: List[AlertCallback] = []
+        self._lock = threading.RLock()
+        self._subscriptions = [
+            (TRANSACTIONS_ADDED, self._on_added),
+            (TRANSACTIONS_REMOVED, self._on_removed),
+            (BUDGET_CHANGED, self._on_budget_changed),
+            (BUDGET_REMOVED, self._on_budget_removed),
+            (LEDGER_CHANGED, self._on_ledger_changed),
+        ]
+
+    def seed(self) -> None:
+        """(Re)load month-to-date spending and budgets from the database."""
+        month = self._fixed_month or self._today().strftime("%Y-%m")
+        # Read under the lock too, so no event is applied between the read and the swap.
+        with self._lock:
+            totals = self.db.sum_by_category(start_month=month, end_month=month)
+            budgets = self.db.get_budgets()
+            self.month = month
+            self._spent = {c: -to_cents(e) for c, e in zip(totals["category"], totals["expense"]) if e}
+            self._limits = {c: to_cents(limit)
+                            for c, limit in zip(budgets["category"], budgets["monthly_limit"])}
+
+    def start(self) -> "BudgetAlertEngine":
+        """Start following transaction and budget events, then seed."""
+        # Subscribed first so a write landing during the seed is not lost:
+        # its event waits for the lock and is applied after the seed.
+        with self._lock:
+            for event, handler in self._subscriptions:
+                events.subscribe(event, handler)
+            self.seed()
+        return self
+
+    def stop(self) -> None:
+        for event, handler in self._subscriptions:
+            events.unsubscribe(event, handler)
+
+    def on_alert(self, callback: AlertCallback) -> AlertCallback:
+        self._callbacks.append(callback)
+        return callback
+
+    def remove_callback(self, callback: AlertCallback) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def spent(self, category: str) -> float:
+        """Month-to-date spending for a category, as a positive amount."""
+        with self._lock:
+            return from_cents(self._spent.get(category, 0))
+
+    def _ratio(self, spent: int, limit: Optional[int]) -> float:
+        return spent / limit if limit and limit > 0 else 0.0
+
+    def _crossed(self, category: str, before: float, after: float) -> List[Dict[str, Any]]:
+        """Alerts for thresholds the spent/limit ratio rose through, from before to after."""
+        limit = self._limits.get(category)
+        return [
+            {"category": category, "month": self.month,
+             "spent": from_cents(self._spent.get(category, 0)),
+             "limit": from_cents(limit) if limit is not None else None, "threshold": t}
+            for t in self.thresholds if before < t <= after
+        ]
+
+    def _fire(self, alerts: List[Dict[str, Any]]) -> None:
+        for alert in alerts:
+            for callback in list(self._callbacks):
+                try:
+                    callback(**alert)
+                except Exception:
+                    log.exception("Budget alert callback %r failed", callback)
+
+    def _apply(self, rows: List[dict], sign: int) -> None:
+        alerts = []
+        with self._lock:
+            if not self._fixed_month and self._today().strftime("%Y-%m") != self.month:
+                # New month: totals restart from what is recorded, which already
+                # includes these rows. Take them back out so the loop below
+                # re-applies them once and raises their alerts.
+                self.seed()
+                for row in self._current(rows):
+                    spent = self._spent.get(row["category"], 0)
+                    self._spent[row["category"]] = spent + sign * to_cents(row["amount"])
+            for row in self._current(rows):
+                category = row["category"]
+                limit = self._limits.get(category)
+                before = self._spent.get(category, 0)
+                self._spent[category] = before - sign * to_cents(row["amount"])  # expenses are negative
+                alerts += self._crossed(category, self._ratio(before, limit),
+                                        self._ratio(self._spent[category], limit))
+        self._fire(alerts)
+
+    def _current(self, rows: List[dict]) -> List[dict]:
+        """The expense rows of the tracked month."""
+        return [row for row in rows if row["type"] == "expense" and str(row["date"])[:7] == self.month]
+
+    def _ours(self, db: Optional[ExpenseDatabase]) -> bool:
+        return same_db(resolve_db(db), self.db)
+
+    def _on_added(self, rows: List[dict], db: Optional[ExpenseDatabase] = None) -> None:
+        if self._ours(db):
+            self._apply(rows, 1)
+
+    def _on_removed(self, rows: List[dict], db: Optional[ExpenseDatabase] = None) -> None:
+        if self._ours(db):
+            self._apply(rows, -1)
+
+    def _on_ledger_changed(self, changed: Optional[Set[Tuple[str, str]]], budgets: bool,
+                           db: Optional[ExpenseDatabase] = None) -> None:
+        # Row-level writes follow with their own events; a reset (clear_all,
+        # a replacing import) reports no rows, so start over from the database.
+        if changed is None and self._ours(db):
+            self.seed()
+
+    def _on_budget_changed(self, category: str, limit: float,
+                           db: Optional[ExpenseDatabase] = None) -> None:
+        if not self._ours(db):
+            return
+        # Lowering a budget can put a category over a threshold without any new spending.
+        with self._lock:
+            spent = self._spent.get(category, 0)
+            before = self._ratio(spent, self._limits.get(category))
+            self._limits[category] = to_cents(limit)
+            alerts = self._crossed(category, before, self._ratio(spent, self._limits[category]))
+        self._fire(alerts)
+
+    def _on_budget_removed(self, category: str, db: Optional[ExpenseDatabase] = None) -> None:
+        if not self._ours(db):
+            return
+        with self._lock:
+            self._limits.pop(category, None)
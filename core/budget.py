@@ -1,57 +1,62 @@
-import sqlite3
 import pandas as pd
-from typing import Tuple
-from database import ExpenseDatabase
+from typing import Optional, Tuple
+from core.ledgers import DbArg, resolve_db
+from core.events import BUDGET_CHANGED, BUDGET_REMOVED, events
+from core.periods import parse_month
 
-db = ExpenseDatabase()
-
-def set_category_budget(category: str, limit: float) -> None:
+def set_category_budget(category: str, limit: float, db: DbArg = None) -> None:
     """
     Set or update the monthly budget for a category.
     """
+    db = resolve_db(db)
     db.set_budget(category, limit)
+    events.emit(BUDGET_CHANGED, category=category, limit=limit, db=db)
 
-def get_category_budget(category: str) -> float:
+def get_category_budget(category: str, db: DbArg = None) -> float:
     """
     Return the monthly_limit for the given category, or 0.0 if not defined.
     """
-    budgets = db.get_budgets()
-    row = budgets[budgets["category"] == category]
-    return float(row["monthly_limit"].iloc[0]) if not row.empty else 0.0
+    limit = resolve_db(db).get_budget(category)
+    return float(limit) if limit is not None else 0.0
 
-def remove_category_budget(category: str) -> bool:
+def remove_category_budget(category: str, db: DbArg = None) -> bool:
     """
     Remove a budget entry by category. Return True if deleted.
     """
-    conn = sqlite3.connect(db.db_path)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM budgets WHERE category = ?", (category,))
-    conn.commit()
-    deleted = cur.rowcount > 0
-    conn.close()
+    db = resolve_db(db)
+    deleted = db.delete_budget(category)
+    if deleted:
+        events.emit(BUDGET_REMOVED, category=category, db=db)
     return deleted
 
-def list_budgets() -> pd.DataFrame:
+def list_budgets(db: DbArg = None) -> pd.DataFrame:
     """
     Return all budget entries as a DataFrame.
     """
-    return db.get_budgets()
+    return resolve_db(db).get_budgets()
 
-def check_budget(category: str) -> Tuple[bool, float]:
+def check_budget(category: str, month: Optional[str] = None,
+                 db: DbArg = None) -> Tuple[bool, float]:
     """
     Check if a category is over its budget.
+    With month ("YYYY-MM") only that month's spending counts against the
+    monthly limit; without it, all-time spending does.
     Returns (is_over_budget, remaining_amount).
     """
-    summary = db.get_spending_summary()
-    row = summary[summary["category"] == category]
-    if row.empty:
+    if month is not None:
+        parse_month(month)
+    status = resolve_db(db).budget_status(month=month, category=category)
+    if status.empty:
         return (False, 0.0)
-    rem = float(row["remaining"].iloc[0])
+    rem = float(status["remaining"].iloc[0])
     return (rem < 0, rem)
 
-def budget_alerts(threshold: float = 0.0) -> pd.DataFrame:
+def budget_alerts(threshold: float = 0.0, month: Optional[str] = None,
+                  db: DbArg = None) -> pd.DataFrame:
     """
-    Return categories whose remaining budget is <= threshold.
+    Return categories whose remaining budget is <= threshold,
+    for one "YYYY-MM" month or, without month, over all time.
     """
-    summary = db.get_spending_summary()
-    return summary[summary["remaining"] <= threshold]
\ No newline at end of file
+    if month is not None:
+        parse_month(month)
+    return resolve_db(db).budget_status(month=month, threshold=threshold)
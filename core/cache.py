@@ -0,0 +1,177 @@
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+from database import ExpenseDatabase
+from core.events import LEDGER_CHANGED, events
+from core.ledgers import resolve_db
+
+Tag = Tuple[Hashable, ...]
+
+class ReportCache:
+    """
+    Bounded LRU cache for report results.
+    Every entry carries dependency tags such as (scope, "month", "2025-06"),
+    where scope identifies the database, so writes can invalidate exactly
+    the entries they affect. Every invalidation is numbered, so a value
+    computed from data read before one can be refused by put().
+    """
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Set[Tag]]]" = OrderedDict()
+        self._by_tag: Dict[Tag, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+        self._generation = self._cleared_at = 0
+        self._invalidated_at: Dict[Tag, int] = {}
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) and count a hit or a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def generation(self) -> int:
+        """The current invalidation number, to pass to put() as `since`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[Tag],
+            since: Optional[int] = None) -> bool:
+        """
+        Store value under key. With `since` (a generation() taken before the
+        value was computed), the value is dropped instead if any of its tags
+        was invalidated in the meantime. Returns whether it was stored.
+        """
+        with self._lock:
+            tags = set(tags)
+            if since is not None and (self._cleared_at > since or any(
+                    self._invalidated_at.get(tag, 0) > since for tag in tags)):
+                return False
+            self._drop(key)
+            self._entries[key] = (value, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def _drop(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[1]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+        return True
+
+    def invalidate(self, *tags: Tag) -> int:
+        """Drop every entry carrying any of the tags; return how many were dropped."""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self._generation
+            keys = set().union(*(self._by_tag.get(tag, ()) for tag in tags))
+            dropped = sum(self._drop(key) for key in keys)
+            self.invalidations += dropped
+            return dropped
+
+    def invalidate_transaction(self, scope: str, date: str, category: str) -> int:
+        """Invalidate everything a transaction on `date` in `category` can change."""
+        month = str(date)[:7]
+        return self.invalidate(
+            (scope, "month", month), (scope, "year", month[:4]),
+            (scope, "month-category", month, category)
+        )
+
+    def invalidate_budgets(self, scope: str) -> int:
+        """Invalidate everything that depends on the budgets table."""
+        return self.invalidate((scope, "budgets"))
+
+    def invalidate_scope(self, scope: str) -> int:
+        """Invalidate every entry of one database."""
+        return self.invalidate((scope,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+            self._invalidated_at.clear()
+            self._generation += 1
+            self._cleared_at = self._generation
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+report_cache = ReportCache()
+
+def cache_scope(db: ExpenseDatabase) -> str:
+    """
+    The cache key and tag prefix of a database: its resolved file path, or
+    the scope a LedgerSnapshot declares for itself.
+    """
+    return getattr(db, "cache_scope", None) or str(db.db_path.resolve())
+
+def _on_ledger(changed: Optional[Set[Tuple[str, str]]], budgets: bool,
+               db: Optional[ExpenseDatabase] = None) -> None:
+    scope = cache_scope(resolve_db(db))
+    if changed is None:
+        report_cache.invalidate_scope(scope)
+        return
+    for month, category in changed:
+        report_cache.invalidate_transaction(scope, month, category)
+    if budgets:
+        report_cache.invalidate_budgets(scope)
+
+# Every write, whichever layer makes it, is announced by ExpenseDatabase.
+events.subscribe(LEDGER_CHANGED, _on_ledger)
+
+def cached_report(tags: Callable[..., Iterable[Tag]],
+                  normalize: Optional[Callable[..., Tuple[Any, ...]]] = None) -> Callable:
+    """
+    Cache a report function in report_cache.
+    The function takes a keyword-only db (handle, ledger ID or None); it is
+    called with the resolved handle, and entries are keyed and tagged by its
+    database. normalize(*args, **kwargs) returns the canonical positional
+    arguments, so every spelling of a month shares one entry and its tags.
+    tags(result, *args, **kwargs) returns the dependency tags of a
+    computed result. Callers always receive a copy, so mutating a result
+    never corrupts the cache.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, db: Any = None, **kwargs: Any) -> Any:
+            db = resolve_db(db)
+            scope = cache_scope(db)
+            if normalize is not None:
+                args, kwargs = tuple(normalize(*args, **kwargs)), {}
+            key = (fn.__name__, scope, args, tuple(sorted(kwargs.items())))
+            found, value = report_cache.get(key)
+            if not found:
+                # Computed outside the lock: a write landing meanwhile makes put() refuse it.
+                since = report_cache.generation()
+                value = fn(*args, db=db, **kwargs)
+                # (scope,) lets a bulk write drop every entry of its database.
+                entry_tags = [(scope,)] + [(scope,) + tuple(tag)
+                                           for tag in tags(value, *args, **kwargs)]
+                report_cache.put(key, value, entry_tags, since=since)
+            return copy.deepcopy(value) if isinstance(value, dict) else value.copy()
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+log = logging.getLogger(__name__)
+
+# Event names and their keyword payloads. Every event also carries
+# db: the ExpenseDatabase (ledger) that was written.
+# ExpenseDatabase emits LEDGER_CHANGED and then the row events after every
+# committed write, whichever layer made it, so each row is reported once.
+# Writes that reset the ledger (clear_all, a replacing import) report
+# changed=None and no rows. Budget events come from core.budget, which the
+# budgets flag of LEDGER_CHANGED duplicates: handle that flag idempotently.
+TRANSACTIONS_ADDED = "transactions_added"      # rows: List[dict] with id and TX_COLUMNS
+TRANSACTIONS_REMOVED = "transactions_removed"  # rows: List[dict] of the deleted rows
+BUDGET_CHANGED = "budget_changed"              # category: str, limit: float
+BUDGET_REMOVED = "budget_removed"              # category: str
+LEDGER_CHANGED = "ledger_changed"              # changed: Set[(month, category)] or None, budgets: bool
+
+Handler = Callable[..., None]
+
+class EventBus:
+    """
+    In-process publish/subscribe for data changes.
+    Handlers run synchronously on the emitting thread; an exception in one
+    handler is logged and does not stop the others or fail the write.
+    """
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, handler: Handler) -> Handler:
+        with self._lock:
+            self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def unsubscribe(self, event: str, handler: Handler) -> None:
+        with self._lock:
+            handlers = self._handlers.get(event, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def has_subscribers(self, event: str) -> bool:
+        with self._lock:
+            return bool(self._handlers.get(event))
+
+    def emit(self, event: str, **payload: Any) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(event, ()))
+        for handler in handlers:
+            try:
+                handler(**payload)
+            except Exception:
+                log.exception("Handler %r for %s failed", handler, event)
+
+events = EventBus()
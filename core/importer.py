@@ -0,0 +1,309 @@
+import csv
+import hashlib
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from database import (
+    TX_COLUMNS, TX_TYPES, ExpenseDatabase, Row, normalize_row, signed_amount, to_cents
+)
+from core.ledgers import DbArg, resolve_db
+from core.periods import month_bounds
+
+# Statement wording for the transaction type, matched case-insensitively.
+DEFAULT_TYPE_VALUES = {
+    "income": "income", "credit": "income", "cr": "income",
+    "expense": "expense", "debit": "expense", "dr": "expense",
+}
+
+Rejected = Tuple[int, str]  # (row number, reason)
+
+class ImportConfig:
+    """
+    How to read one statement layout.
+    columns maps date, amount, category, description and type to source
+    header names; any of category, description and type may be omitted.
+    Statements that split money into debit/credit columns set those instead
+    of an amount column; each row takes whichever of the two is non-zero and
+    is rejected if both are. Without a type column, negative amounts (or debits)
+    are expenses. Amounts are then signed like add_expense/add_income.
+    """
+    def __init__(self,
+                 columns:          Optional[Dict[str, str]]=None,
+                 debit:            Optional[str]=None,
+                 credit:           Optional[str]=None,
+                 date_format:      str="%Y-%m-%d",
+                 delimiter:        str=",",
+                 encoding:         str="utf-8-sig",
+                 thousands:        str=",",
+                 decimal:          str=".",
+                 default_category: str="Uncategorized",
+                 type_values:      Optional[Dict[str, str]]=None):
+        self.columns = dict(columns) if columns is not None else {c: c for c in TX_COLUMNS}
+        self.debit = debit
+        self.credit = credit
+        self.date_format = date_format
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.thousands = thousands
+        self.decimal = decimal
+        self.default_category = default_category
+        self.type_values = {k.lower(): v for k, v in (type_values or DEFAULT_TYPE_VALUES).items()}
+        unknown = set(self.columns) - set(TX_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown target column(s): {sorted(unknown)}")
+        if "date" not in self.columns:
+            raise ValueError("A date column is required")
+        if "amount" not in self.columns and not (debit or credit):
+            raise ValueError("An amount column or debit/credit columns are required")
+        bad = set(self.type_values.values()) - set(TX_TYPES)
+        if bad:
+            raise ValueError(f"type_values must map to {TX_TYPES}, got {sorted(bad)}")
+
+    @classmethod
+    def from_json(cls, path: str) -> "ImportConfig":
+        """Load a config from a JSON object whose keys are the constructor's arguments."""
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def resolve(self, header: Sequence[str]) -> Dict[str, int]:
+        """Map each configured field to its index in the statement header."""
+        wanted = dict(self.columns)
+        if self.debit:
+            wanted["debit"] = self.debit
+        if self.credit:
+            wanted["credit"] = self.credit
+        index = {name.strip(): i for i, name in enumerate(header)}
+        missing = [src for src in wanted.values() if src not in index]
+        if missing:
+            raise ValueError(f"Statement is missing column(s): {missing}")
+        return {field: index[src] for field, src in wanted.items()}
+
+def content_hash(row: Row) -> bytes:
+    """
+    Digest of a normalized row, used to recognise transactions already in the
+    ledger. The amount is hashed as stored, in cents.
+    """
+    d, amount, category, description, typ = row
+    return hashlib.blake2b(
+        f"{d}\x1f{to_cents(amount)}\x1f{category}\x1f{description}\x1f{typ}".encode(),
+        digest_size=16
+    ).digest()
+
+def _parse_amount(text: str, config: ImportConfig) -> float:
+    text = text.strip()
+    negative = text.startswith("(") and text.endswith(")")  # accounting notation
+    text = text.strip("()").replace(config.thousands, "").replace(" ", "")
+    if config.decimal != ".":
+        text = text.replace(config.decimal, ".")
+    amount = float(text)
+    return -amount if negative else amount
+
+def _parse_date(text: str, config: ImportConfig) -> str:
+    if config.date_format == "%Y-%m-%d":
+        return text  # already ISO; normalize_row validates it
+    return datetime.strptime(text, config.date_format).strftime("%Y-%m-%d")
+
+def _parse_record(record: List[str], fields: Dict[str, int], config: ImportConfig, n: int,
+                  dates: Dict[str, str]) -> Row:
+    """
+    Turn one statement record into a normalized, signed insert tuple.
+    dates memoizes parsed dates; statements repeat the same few dates many times.
+    """
+    def get(field: str) -> str:
+        i = fields.get(field)
+        return record[i].strip() if i is not None and i < len(record) else ""
+
+    raw_date = get("date")
+    d = dates.get(raw_date)
+    if d is None:
+        try:
+            d = dates[raw_date] = _parse_date(raw_date, config)
+        except ValueError:
+            raise ValueError(f"Row {n}: invalid date {raw_date!r}, "
+                             f"expected {config.date_format}") from None
+    try:
+        if "amount" in fields:
+            amount = _parse_amount(get("amount"), config)
+            debit = amount < 0
+        else:
+            # Statements often write 0.00 in the unused column, so the side
+            # is the one with a non-zero amount, not merely a filled one.
+            sides = {side: _parse_amount(get(side), config)
+                     for side in ("debit", "credit") if get(side)}
+    except ValueError:
+        raise ValueError(f"Row {n}: invalid amount") from None
+    if "amount" not in fields:
+        if not sides:
+            raise ValueError(f"Row {n}: no debit or credit amount")
+        nonzero = [side for side, value in sides.items() if value]
+        if len(nonzero) > 1:
+            raise ValueError(f"Row {n}: both debit and credit are non-zero")
+        side = nonzero[0] if nonzero else next(iter(sides))
+        debit, amount = side == "debit", sides[side]
+    if "type" in fields:
+        raw = get("type")
+        typ = config.type_values.get(raw.lower())
+        if typ is None:
+            raise ValueError(f"Row {n}: unknown type {raw!r}")
+    else:
+        typ = "expense" if debit else "income"
+    category = get("category") or config.default_category
+    return normalize_row((d, signed_amount(amount, typ), category, get("description"), typ), n)
+
+def parse_chunk(records: List[List[str]], fields: Dict[str, int], config: ImportConfig,
+                first: int) -> Tuple[List[Tuple[Row, bytes]], List[Rejected]]:
+    """
+    Parse a chunk of records numbered from `first`; runs in a worker process.
+    Returns (row, content hash) pairs and the rejected (row number, reason) pairs.
+    """
+    parsed, rejected = [], []
+    dates: Dict[str, str] = {}
+    for n, record in enumerate(records, first):
+        try:
+            row = _parse_record(record, fields, config, n, dates)
+        except ValueError as e:
+            rejected.append((n, str(e)))
+        else:
+            parsed.append((row, content_hash(row)))
+    return parsed, rejected
+
+class _Writer(threading.Thread):
+    """
+    The single thread that writes to the database. Each parsed chunk is
+    deduplicated against existing rows, loaded one month at a time as the
+    statement reaches it, and committed as one batch.
+    """
+    def __init__(self, db: ExpenseDatabase, batches: "queue.Queue"):
+        super().__init__(name="import-writer", daemon=True)
+        self.db = db
+        self.batches = batches
+        self.existing: Counter = Counter()
+        self.loaded_months: set = set()
+        self.inserted = self.duplicates = 0
+        self.error: Optional[BaseException] = None
+
+    def _load_month(self, month: str) -> None:
+        # A multiset: a statement may legitimately repeat an identical
+        # transaction, so each existing copy absorbs one incoming copy.
+        start, end = month_bounds(month)
+        existing = self.db.query_transactions(start_date=start, end_date=end,
+                                              columns=list(TX_COLUMNS))
+        for d, amount, category, description, typ in existing.itertuples(index=False):
+            self.existing[content_hash(
+                (d.strftime("%Y-%m-%d"), float(amount), str(category), description or "", str(typ))
+            )] += 1
+        self.loaded_months.add(month)
+
+    def run(self) -> None:
+        try:
+            while True:
+                parsed = self.batches.get()
+                if parsed is None:
+                    break
+                rows = []
+                for row, digest in parsed:
+                    if row[0][:7] not in self.loaded_months:
+                        self._load_month(row[0][:7])
+                    if self.existing[digest] > 0:
+                        self.existing[digest] -= 1
+                        self.duplicates += 1
+                    else:
+                        rows.append(row)
+                if rows:
+                    self.db.add_transactions(rows)  # emits TRANSACTIONS_ADDED
+                    self.inserted += len(rows)
+        except BaseException as e:
+            self.error = e
+            while self.batches.get() is not None:  # drain so the reader never blocks
+                pass
+        finally:
+            self.db.release()
+
+def _chunks(reader: Iterator[List[str]], size: int) -> Iterator[Tuple[int, List[List[str]]]]:
+    first = 1
+    while True:
+        records = list(islice(reader, size))
+        if not records:
+            return
+        yield first, records
+        first += len(records)
+
+def import_statement(path:        str,
+                     config:      Optional[ImportConfig]=None,
+                     db:          DbArg=None,
+                     chunk_size:  int=20000,
+                     workers:     Optional[int]=None,
+                     max_errors:  int=100) -> Dict[str, Any]:
+    """
+    Stream a CSV statement into the ledger.
+    The file is read chunk_size records at a time; chunks are parsed in a
+    pool of `workers` processes (inline when workers <= 1) and committed in
+    statement order by a single writer thread, one transaction per chunk.
+    Rows already in the ledger (same content hash) are skipped, so
+    re-importing a statement is harmless. Invalid rows are rejected, not fatal.
+    Returns counts, elapsed seconds, rows/sec and up to max_errors rejection reasons.
+    """
+    config = config or ImportConfig()
+    db = resolve_db(db)
+    workers = multiprocessing.cpu_count() if workers is None else workers
+    started = time.perf_counter()
+    batches: "queue.Queue" = queue.Queue(maxsize=max(2, workers) * 2)
+    writer = _Writer(db, batches)
+    rejected: List[Rejected] = []
+    read = rejected_count = 0
+
+    def collect(result: Tuple[List[Tuple[Row, bytes]], List[Rejected]]) -> None:
+        nonlocal rejected_count
+        parsed, errors = result
+        rejected_count += len(errors)
+        rejected.extend(errors[:max(0, max_errors - len(rejected))])
+        batches.put(parsed)
+
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) \
+        if workers > 1 else None
+    writer.start()
+    try:
+        with open(path, newline="", encoding=config.encoding) as f:
+            reader = csv.reader(f, delimiter=config.delimiter)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError(f"{path} is empty")
+            fields = config.resolve(header)
+            pending: "deque[Future]" = deque()
+            for first, records in _chunks(reader, chunk_size):
+                read += len(records)
+                if pool is None:
+                    collect(parse_chunk(records, fields, config, first))
+                    continue
+                pending.append(pool.submit(parse_chunk, records, fields, config, first))
+                # Bounded read-ahead; results are collected in order so rows keep statement order.
+                while len(pending) > workers * 2:
+                    collect(pending.popleft().result())
+                if writer.error is not None:
+                    break
+            while pending:
+                collect(pending.popleft().result())
+    finally:
+        batches.put(None)
+        writer.join()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if writer.error is not None:
+        raise writer.error
+    elapsed = time.perf_counter() - started
+    return {
+        "read": read,
+        "inserted": writer.inserted,
+        "duplicates": writer.duplicates,
+        "rejected": rejected_count,
+        "seconds": elapsed,
+        "rows_per_sec": read / elapsed if elapsed else 0.0,
+        "errors": rejected,
+    }
@@ -0,0 +1,104 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from database import ExpenseDatabase, get_db
+
+# What core functions accept as their db argument: a handle, a ledger ID, or
+# None for the shared default database.
+DbArg = Union[ExpenseDatabase, str, None]
+
+_LEDGER_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+class LedgerRegistry:
+    """
+    Maps ledger IDs to separate SQLite files, one per ledger (e.g. per team).
+    A ledger lives at <root>/<id>.db unless registered with an explicit
+    path; registrations are kept in <root>/ledgers.json. Open handles are
+    cached, so each ledger has one connection pool per process.
+    """
+    def __init__(self, root: str = "resources/ledgers"):
+        self.root = Path(root)
+        self._handles: Dict[str, ExpenseDatabase] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def _index(self) -> Path:
+        return self.root / "ledgers.json"
+
+    def _registered(self) -> Dict[str, str]:
+        if not self._index.exists():
+            return {}
+        with open(self._index, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _validate(self, ledger_id: str) -> str:
+        if not _LEDGER_ID_RE.match(ledger_id):
+            raise ValueError(f"Invalid ledger ID {ledger_id!r}")
+        return ledger_id
+
+    def path(self, ledger_id: str) -> Path:
+        """The database file of a ledger (which need not exist yet)."""
+        self._validate(ledger_id)
+        registered = self._registered().get(ledger_id)
+        return Path(registered) if registered else self.root / f"{ledger_id}.db"
+
+    def register(self, ledger_id: str, path: Optional[str] = None) -> Path:
+        """Record the database file for a ledger; by default <root>/<id>.db."""
+        self._validate(ledger_id)
+        with self._lock:
+            entries = self._registered()
+            entries[ledger_id] = str(path or self.root / f"{ledger_id}.db")
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self._index, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+        return Path(entries[ledger_id])
+
+    def unregister(self, ledger_id: str) -> bool:
+        """Forget a registration and close its handle; the database file is kept."""
+        with self._lock:
+            entries = self._registered()
+            found = entries.pop(ledger_id, None) is not None
+            if found:
+                with open(self._index, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+            handle = self._handles.pop(ledger_id, None)
+        if handle is not None:
+            handle.close()
+        return found
+
+    def ids(self) -> List[str]:
+        """Registered ledgers plus any <root>/*.db files, sorted."""
+        found = set(self._registered())
+        if self.root.is_dir():
+            found.update(p.stem for p in self.root.glob("*.db") if _LEDGER_ID_RE.match(p.stem))
+        return sorted(found)
+
+    def open(self, ledger_id: str) -> ExpenseDatabase:
+        """The (cached) database handle of a ledger, created on first use."""
+        with self._lock:
+            handle = self._handles.get(ledger_id)
+            if handle is None:
+                handle = self._handles[ledger_id] = ExpenseDatabase(str(self.path(ledger_id)))
+            return handle
+
+    def close_all(self) -> None:
+        with self._lock:
+            handles, self._handles = self._handles, {}
+        for handle in handles.values():
+            handle.close()
+
+ledgers = LedgerRegistry()
+
+def resolve_db(db: DbArg = None) -> ExpenseDatabase:
+    """Turn a db argument (handle, ledger ID or None) into a database handle."""
+    if db is None:
+        return get_db()
+    if isinstance(db, str):
+        return ledgers.open(db)
+    return db
+
+def same_db(a: ExpenseDatabase, b: ExpenseDatabase) -> bool:
+    """True if both handles point at the same database file."""
+    return a is b or a.db_path.resolve() == b.db_path.resolve()
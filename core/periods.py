@@ -0,0 +1,44 @@
+import calendar
+import re
+from datetime import date
+from typing import List, Tuple, Union
+
+_MONTH_RE = re.compile(r"^(\d{4})-(\d{2})$")
+
+def parse_month(month: str) -> Tuple[int, int]:
+    """Split a "YYYY-MM" month into (year, month), raising ValueError if malformed."""
+    match = _MONTH_RE.match(str(month).strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Invalid month {month!r}, expected YYYY-MM")
+    return int(match.group(1)), int(match.group(2))
+
+def normalize_month(month: str) -> str:
+    """Return a month as "YYYY-MM" (e.g. " 2025-06" becomes "2025-06")."""
+    return "%04d-%02d" % parse_month(month)
+
+def month_bounds(month: str) -> Tuple[str, str]:
+    """Return the first and last calendar day of a "YYYY-MM" month as ISO dates."""
+    year, m = parse_month(month)
+    last = calendar.monthrange(year, m)[1]
+    return f"{year:04d}-{m:02d}-01", f"{year:04d}-{m:02d}-{last:02d}"
+
+def year_months(year: Union[str, int]) -> Tuple[str, str]:
+    """Return the first and last month of a year as "YYYY-MM"."""
+    y = int(str(year).strip()[:4])
+    return f"{y:04d}-01", f"{y:04d}-12"
+
+def month_range(start_month: str, end_month: str) -> List[str]:
+    """Every "YYYY-MM" month from start_month to end_month inclusive."""
+    y, m = parse_month(start_month)
+    end_y, end_m = parse_month(end_month)
+    first, last = y * 12 + m - 1, end_y * 12 + end_m - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(first, last + 1)]
+
+def date_key(value: Union[str, date]) -> int:
+    """
+    Convert a date ("YYYY-MM-DD" or date/datetime) to its yyyymmdd integer,
+    the form stored in the indexed transactions.date_key column.
+    """
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value).strip()[:10])
+    return value.year * 10000 + value.month * 100 + value.day
@@ -1,77 +1,154 @@
+import multiprocessing
 import pandas as pd
-from typing import Dict, Any
-from database import ExpenseDatabase
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, Optional, Sequence
+from database import ExpenseDatabase, from_cents, to_cents
 from core.budget import get_category_budget
+from core.cache import cached_report, report_cache
+from core.ledgers import DbArg, LedgerRegistry, ledgers
+from core.periods import month_range, normalize_month, parse_month, year_months
 
-db = ExpenseDatabase()
+def _month_arg(month: str) -> tuple:
+    return (normalize_month(month),)
 
-def generate_monthly_report(month: str) -> Dict[str, float]:
+def _add(a, b):
+    """a + b for currency amounts (scalars or columns), added exactly in cents."""
+    return from_cents(to_cents(a) + to_cents(b))
+
+
+@cached_report(lambda rep, month: [("month", month)], normalize=_month_arg)
+def generate_monthly_report(month: str, *, db: DbArg = None) -> Dict[str, float]:
     """
     Generate a report for a given month with total income, expense, and net.
     Month format: "YYYY-MM"
     """
-    start_date = f"{month}-01";end_date = f"{month}-31"
-    df = db.get_transactions(start_date=start_date, end_date=end_date)
-    income = df[df["type"] == "income"]["amount"].sum()
-    expense = df[df["type"] == "expense"]["amount"].sum()
-    net = income + expense  # expense is negative
+    parse_month(month)
+    totals = db.sum_by_type(start_month=month, end_month=month)
+    income, expense = totals["income"], totals["expense"]
+    net = _add(income, expense)  # expense is negative
     return {"income": income, "expense": expense, "net": net}
 
 
-def generate_category_report(month: str) -> pd.DataFrame:
+@cached_report(lambda df, month: [("month", month)], normalize=_month_arg)
+def generate_category_report(month: str, *, db: DbArg = None) -> pd.DataFrame:
     """
     Generate a category-wise report for a given month.
     Returns DataFrame with columns: category, income, expense, net
     """
-    start_date = f"{month}-01";end_date = f"{month}-31"
-    df = db.get_transactions(start_date=start_date, end_date=end_date)
-    def pivot_and_format(category_type: str) -> pd.DataFrame:
-        sub_df = df[df["type"] == category_type]
-        return sub_df.groupby("category")["amount"].sum().reset_index().rename(
-            columns={"amount": category_type}
-        )
-    income_df = pivot_and_format("income")
-    expense_df = pivot_and_format("expense")
-    merged = pd.merge(income_df, expense_df, on="category", how="outer").fillna(0)
-    merged["net"] = merged["income"] + merged["expense"]
+    parse_month(month)
+    merged = db.sum_by_category(start_month=month, end_month=month)
+    merged["net"] = _add(merged["income"], merged["expense"])
     return merged[["category", "income", "expense", "net"]]
 
 
-def generate_budget_report(month: str) -> pd.DataFrame:
+@cached_report(lambda df, month: [("budgets",)] +
+               [("month-category", month, cat) for cat in df["category"]],
+               normalize=_month_arg)
+def generate_budget_report(month: str, *, db: DbArg = None) -> pd.DataFrame:
     """
     Generate a budget vs actual spending report.
     Returns DataFrame with columns: category, limit, spent, remaining
     """
+    parse_month(month)
     budget_df = db.get_budgets()
     if budget_df.empty:
         return pd.DataFrame(columns=["category", "limit", "spent", "remaining"])
     # Get spending for the month
-    start_date = f"{month}-01";end_date = f"{month}-31"
-    trans_df = db.get_transactions(start_date=start_date, end_date=end_date)
-    spending = trans_df[trans_df["type"] == "expense"].groupby("category")["amount"].sum()
-    spending.name = "spent"
+    spending = db.sum_by_category(start_month=month, end_month=month)
+    spending = spending.set_index("category")["expense"].rename("spent")
     # Merge with budgets and fill missing spending as 0
     report = budget_df.set_index("category").join(spending).fillna(0)
-    report["remaining"] = report["monthly_limit"] + report["spent"]  # expense is negative
+    report["remaining"] = _add(report["monthly_limit"], report["spent"])  # expense is negative
     report = report.reset_index()
     report = report.rename(columns={"monthly_limit": "limit"})
     return report[["category", "limit", "spent", "remaining"]]
 
 
-def get_monthly_trend(year: str) -> pd.DataFrame:
+@cached_report(lambda df, year: [("year", year)],
+               normalize=lambda year: (year_months(year)[0][:4],))
+def get_monthly_trend(year: str, *, db: DbArg = None) -> pd.DataFrame:
     """
     Get monthly income, expense, and net for a given year.
     Returns DataFrame with columns: month, income, expense, net
     """
-    df = db.get_transactions()
-    df["month"] = pd.to_datetime(df["date"]).dt.to_period("M").astype(str)
-    trend = df.pivot_table(
-        index="month",
-        columns="type",
-        values="amount",
-        aggfunc="sum"
-    ).fillna(0)
-    trend["net"] = trend["income"] + trend["expense"]
+    start_month, end_month = year_months(year)
+    trend = db.monthly_totals(start_month=start_month, end_month=end_month)
+    trend["net"] = _add(trend["income"], trend["expense"])
+    return trend[["month", "income", "expense", "net"]]
+
+
+@cached_report(lambda df, start_month, end_month: [("month", m) for m in df["month"]],
+               normalize=lambda start_month, end_month: (normalize_month(start_month),
+                                                         normalize_month(end_month)))
+def get_trend(start_month: str, end_month: str, *, db: DbArg = None) -> pd.DataFrame:
+    """
+    Get monthly income, expense, and net for every month from start_month to
+    end_month inclusive ("YYYY-MM"), with months without transactions as 0.
+    Returns DataFrame with columns: month, income, expense, net
+    """
+    months = month_range(start_month, end_month)
+    trend = db.monthly_totals(start_month=start_month, end_month=end_month)
+    trend = trend.set_index("month").reindex(months, fill_value=0.0)
+    trend.index.name = "month"
     trend = trend.reset_index()
-    trend = trend[trend["month"].str.startswith(year)]
-    return trend[["month", "income", "expense", "net"]]
\ No newline at end of file
+    trend["net"] = _add(trend["income"], trend["expense"])
+    return trend[["month", "income", "expense", "net"]]
+
+
+def _shard_category_report(db_path: str, month: str) -> pd.DataFrame:
+    # Worker process entry point: each process opens its own connection to the shard.
+    db = ExpenseDatabase(db_path)
+    try:
+        return db.sum_by_category(start_month=month, end_month=month)
+    finally:
+        db.close()
+
+
+def cross_ledger_category_report(month: str,
+                                 ledger_ids: Optional[Sequence[str]] = None,
+                                 workers: Optional[int] = None,
+                                 by_ledger: bool = False,
+                                 registry: Optional[LedgerRegistry] = None,
+                                 executor: Optional[Executor] = None) -> pd.DataFrame:
+    """
+    generate_category_report across ledgers (default: every registered one).
+    The per-ledger results are merged into one category, income, expense, net
+    report. by_ledger=True returns the per-ledger rows with a ledger column
+    instead. registry defaults to the global ledgers registry.
+    By default the ledgers are read in-process through the report cache: each
+    is a small rollup read, which beats even a warm process pool. Pass an
+    executor, or workers > 1 for a pool that lives for this call only
+    (starting spawn workers costs about a second), to aggregate each ledger
+    in a worker process instead.
+    """
+    parse_month(month)
+    registry = registry or ledgers
+    ids = list(ledger_ids) if ledger_ids is not None else registry.ids()
+    paths = [str(registry.path(i)) for i in ids]
+    if executor is not None:
+        parts = list(executor.map(_shard_category_report, paths, [month] * len(ids)))
+    elif workers is None or min(len(ids), workers) <= 1:
+        parts = [generate_category_report(month, db=registry.open(i)) for i in ids]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(len(ids), workers), mp_context=ctx) as pool:
+            parts = list(pool.map(_shard_category_report, paths, [month] * len(ids)))
+    columns = ["category", "income", "expense", "net"]
+    frames = [part.assign(ledger=ledger_id) for ledger_id, part in zip(ids, parts) if not part.empty]
+    if not frames:
+        return pd.DataFrame(columns=(["ledger"] if by_ledger else []) + columns)
+    combined = pd.concat(frames, ignore_index=True)
+    if by_ledger:
+        combined["net"] = _add(combined["income"], combined["expense"])
+        return combined[["ledger"] + columns]
+    for column in ("income", "expense"):
+        combined[column] = to_cents(combined[column])
+    merged = combined.groupby("category", as_index=False)[["income", "expense"]].sum()
+    merged["net"] = from_cents(merged["income"] + merged["expense"])
+    merged[["income", "expense"]] = from_cents(merged[["income", "expense"]])
+    return merged[columns]
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return hit/miss/eviction/invalidation counters of the report cache."""
+    return report_cache.stats()
\ No newline at end of file
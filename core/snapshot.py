@@ -0,0 +1,206 @@
+from itertools import count
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from database import MINOR_UNITS, TX_TYPES, ExpenseDatabase, from_cents, to_cents
+from core.periods import parse_month
+
+_generations = count()
+
+def _month_ordinal(month: str) -> int:
+    """Months since 1970-01 of a "YYYY-MM" month."""
+    year, m = parse_month(month)
+    return (year - 1970) * 12 + m - 1
+
+def _day_ordinals(keys: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 of yyyymmdd date keys."""
+    months = (keys // 10000 - 1970) * 12 + keys // 100 % 100 - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + (keys % 100 - 1)
+    return days.astype(np.int32)
+
+class LedgerSnapshot:
+    """
+    Read-only, in-memory copy of a ledger for report-heavy sessions.
+    Transactions are held as columns sorted by date: int32 day ordinals,
+    int16 category codes, a bool expense flag and int64 amounts in cents. Month
+    ranges are found with searchsorted and aggregated with bincount, so
+    reports never touch the disk. The snapshot does not follow writes;
+    call refresh() to reload it. It answers the read queries core.reports
+    and core.budget use, and can be passed anywhere those take a db.
+    """
+    def __init__(self, db: ExpenseDatabase, chunk_size: int = 200000):
+        self.source = db
+        self.db_path = db.db_path
+        self.chunk_size = chunk_size
+        self.refresh()
+
+    @property
+    def cache_scope(self) -> str:
+        # Report cache entries of one load never mix with the live database or a later load.
+        return f"{self.db_path.resolve()}#snapshot{self.generation}"
+
+    def refresh(self) -> None:
+        """(Re)load every transaction and budget from the source database."""
+        conn = self.source._get_conn()
+        names, codes_by_id = self.source._category_codes(conn)
+        code_type = np.int16 if len(names) <= np.iinfo(np.int16).max else np.int32
+        keys, codes, expense, amounts = [], [], [], []
+        # Rows without a type are outside every report, as in the rollup.
+        cur = conn.execute("SELECT date_key, category_id, type = 'expense', amount FROM transactions "
+                           "WHERE type IN ('income','expense')")
+        try:
+            while True:
+                rows = cur.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                block = np.array(rows, dtype=np.int64)
+                keys.append(block[:, 0].astype(np.int32))
+                codes.append(codes_by_id[block[:, 1]].astype(code_type))
+                expense.append(block[:, 2].astype(bool))
+                amounts.append(block[:, 3])
+        finally:
+            cur.close()
+        dates = _day_ordinals(np.concatenate(keys)) if keys else np.empty(0, np.int32)
+        order = np.argsort(dates, kind="stable")
+        budgets = self.source.get_budgets()
+        self.categories = np.array(names, dtype=object)
+        self.dates = dates[order]
+        self.category_codes = np.concatenate(codes)[order] if codes else np.empty(0, code_type)
+        self.expense = np.concatenate(expense)[order] if expense else np.empty(0, bool)
+        self.amounts = np.concatenate(amounts)[order] if amounts else np.empty(0, np.int64)
+        self.budgets = budgets
+        ordered = budgets.sort_values("category")
+        names = ordered["category"].to_numpy(dtype=object)
+        positions = np.searchsorted(self.categories, names) if len(names) else np.empty(0, np.intp)
+        known = positions < len(self.categories)
+        known[known] = self.categories[positions[known]] == names[known]
+        # Budgets in category order, with each category's code (-1 if it has no transactions).
+        self._budget_columns = (names, to_cents(ordered["monthly_limit"].to_numpy()),
+                                np.where(known, positions, -1))
+        self.generation = next(_generations)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.category_codes.nbytes + self.expense.nbytes + self.amounts.nbytes
+
+    def _range(self, start_month: Optional[str], end_month: Optional[str]) -> slice:
+        """Positions of the transactions from start_month to end_month inclusive."""
+        lo, hi = 0, len(self.dates)
+        if start_month:
+            first = np.datetime64(_month_ordinal(start_month), "M").astype("datetime64[D]")
+            lo = int(np.searchsorted(self.dates, first.astype(np.int32), "left"))
+        if end_month:
+            after = np.datetime64(_month_ordinal(end_month) + 1, "M").astype("datetime64[D]")
+            hi = int(np.searchsorted(self.dates, after.astype(np.int32), "left"))
+        return slice(lo, max(lo, hi))
+
+    def _group(self, start_month: Optional[str], end_month: Optional[str],
+               by_month: bool, by_category: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Totals in cents and row counts shaped (months, categories, type) for the month
+        range, with the "YYYY-MM" labels of the months axis, which runs from
+        the first to the last month with data. Axes not grouped by have length 1.
+        """
+        rows = self._range(start_month, end_month)
+        slot = self.expense[rows].astype(np.intp)
+        n_cat = len(self.categories) if by_category else 1
+        if by_category:
+            slot += self.category_codes[rows].astype(np.intp) * 2
+        months = np.array([], dtype="datetime64[M]")
+        n_month = 0 if by_month else 1
+        if by_month and slot.size:
+            dates = self.dates[rows]
+            first, last = dates[[0, -1]].astype("datetime64[D]").astype("datetime64[M]")
+            months = np.arange(first, last + 1)
+            # Dates are sorted, so each month is a contiguous run of rows.
+            starts = np.searchsorted(dates, months[1:].astype("datetime64[D]").astype(np.int32))
+            runs = np.diff(starts, prepend=0, append=len(dates))
+            n_month = len(months)
+            slot += np.repeat(np.arange(n_month, dtype=np.intp) * (2 * n_cat), runs)
+        size = n_month * n_cat * 2
+        # bincount adds the int64 cents as float64, which is exact below 2**53 cents.
+        totals = np.bincount(slot, weights=self.amounts[rows], minlength=size).astype(np.int64)
+        counts = np.bincount(slot, minlength=size)
+        shape = (n_month, n_cat, 2)
+        return totals.reshape(shape), counts.reshape(shape), np.datetime_as_string(months)
+
+    def _frame(self, labels: Dict[str, np.ndarray], totals: np.ndarray,
+               counts: np.ndarray) -> pd.DataFrame:
+        present = counts.sum(axis=-1) > 0
+        columns = list(labels) + ["income", "expense"]
+        if not present.any():
+            return pd.DataFrame(columns=columns)  # untyped, like an empty read_sql result
+        data = {name: values[present] for name, values in labels.items()}
+        data["income"] = from_cents(totals[..., 0][present])
+        data["expense"] = from_cents(totals[..., 1][present])
+        return pd.DataFrame(data, columns=columns)
+
+    def sum_by_type(self,
+                    start_month: Optional[str]=None,
+                    end_month:   Optional[str]=None
+                   ) -> Dict[str, float]:
+        """Return {"income": total, "expense": total} for the "YYYY-MM" month range."""
+        totals, _, _ = self._group(start_month, end_month, by_month=False, by_category=False)
+        return dict(zip(TX_TYPES, map(float, from_cents(totals[0, 0]))))
+
+    def sum_by_category(self,
+                        start_month: Optional[str]=None,
+                        end_month:   Optional[str]=None
+                       ) -> pd.DataFrame:
+        """Return per-category income and expense totals, sorted by category."""
+        totals, counts, _ = self._group(start_month, end_month, by_month=False, by_category=True)
+        return self._frame({"category": self.categories}, totals[0], counts[0])
+
+    def monthly_totals(self,
+                       start_month: Optional[str]=None,
+                       end_month:   Optional[str]=None
+                      ) -> pd.DataFrame:
+        """Return income and expense per "YYYY-MM" month that has transactions."""
+        totals, counts, months = self._group(start_month, end_month, by_month=True, by_category=False)
+        return self._frame({"month": months}, totals[:, 0], counts[:, 0])
+
+    def category_month_totals(self,
+                              start_month: Optional[str]=None,
+                              end_month:   Optional[str]=None
+                             ) -> pd.DataFrame:
+        """Return income and expense per month and category, sorted by month then category."""
+        totals, counts, months = self._group(start_month, end_month, by_month=True, by_category=True)
+        n_month, n_cat = counts.shape[:2]
+        labels = {"month": np.repeat(months, n_cat).reshape(n_month, n_cat),
+                  "category": np.tile(self.categories, (n_month, 1))}
+        return self._frame(labels, totals, counts)
+
+    def get_budgets(self) -> pd.DataFrame:
+        return self.budgets.copy()
+
+    def get_budget(self, category: str) -> Optional[float]:
+        """Return the monthly limit for one category, or None if it has no budget."""
+        match = self.budgets.loc[self.budgets["category"] == category, "monthly_limit"]
+        return float(match.iloc[0]) if len(match) else None
+
+    def budget_status(self,
+                      month:     Optional[str]=None,
+                      category:  Optional[str]=None,
+                      threshold: Optional[float]=None
+                     ) -> pd.DataFrame:
+        """
+        Budgets with their spending: category, expense, monthly_limit,
+        remaining, as ExpenseDatabase.budget_status returns them.
+        """
+        columns = ["category", "expense", "monthly_limit", "remaining"]
+        names, limits, codes = self._budget_columns
+        keep = np.ones(len(names), dtype=bool) if category is None else names == category
+        totals, _, _ = self._group(month, month, by_month=False, by_category=True)
+        expense = np.where(codes >= 0, totals[0, codes, 1], 0)
+        remaining = limits + expense
+        if threshold is not None:
+            keep &= remaining <= threshold * MINOR_UNITS
+        if not keep.any():
+            return pd.DataFrame(columns=columns)  # untyped, like an empty read_sql result
+        return pd.DataFrame(dict(zip(columns, (names[keep], from_cents(expense[keep]),
+                                               from_cents(limits[keep]),
+                                               from_cents(remaining[keep])))))
+
@@ -1,51 +1,63 @@
-from typing import Optional
+from typing import Any, Iterable, List, Optional
 import pandas as pd
-import sqlite3
-from database import ExpenseDatabase
+from database import normalize_row, signed_amount
+from core.ledgers import DbArg, resolve_db
 
-db = ExpenseDatabase()
+def _insert(data: dict, db: DbArg) -> int:
+    return resolve_db(db).add_transaction(data)
 
-def add_expense(date: str, amount: float, category: str, description: str) -> int:
+def add_expense(date: str, amount: float, category: str, description: str,
+                db: DbArg = None) -> int:
     """Add an expense transaction and return its ID."""
     data = {
         "date": date,
-        "amount": -abs(float(amount)),
+        "amount": signed_amount(amount, "expense"),
         "category": category,
         "description": description,
         "type": "expense"
     }
-    db.add_transaction(data)
-    return _get_last_id()
+    return _insert(data, db)
 
-def add_income(date: str, amount: float, category: str, description: str) -> int:
+def add_income(date: str, amount: float, category: str, description: str,
+               db: DbArg = None) -> int:
     """Add an income transaction and return its ID."""
     data = {
         "date": date,
-        "amount": abs(float(amount)),
+        "amount": signed_amount(amount, "income"),
         "category": category,
         "description": description,
         "type": "income"
     }
-    db.add_transaction(data)
-    return _get_last_id()
+    return _insert(data, db)
 
-def remove_transaction(tx_id: int) -> bool:
+def add_transactions(rows: Iterable[dict], db: DbArg = None) -> List[int]:
+    """
+    Add many transactions in one database transaction and return their IDs.
+    Each row is a dict with date, amount, category, description and type keys;
+    amounts are signed the same way as add_expense/add_income.
+    """
+    db = resolve_db(db)
+    normalized = [
+        normalize_row({**row, "amount": signed_amount(row["amount"], row.get("type"))}, n)
+        for n, row in enumerate(rows, 1)
+    ]
+    return list(db.add_transactions(normalized))
+
+def remove_transaction(tx_id: int, db: DbArg = None) -> bool:
     """Remove a transaction by ID."""
-    with sqlite3.connect(db.db_path) as conn:
-        return conn.execute(
-            "DELETE FROM transactions WHERE id = ?", (tx_id,)
-        ).rowcount > 0
+    return resolve_db(db).pop_transaction(tx_id) is not None
 
 def get_transactions(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    db: DbArg = None,
+    **filters: Any
 ) -> pd.DataFrame:
-    """Retrieve transactions with optional filters."""
-    df = db.get_transactions(start_date, end_date)
-    return df[df["category"] == category] if category else df
-
-def _get_last_id() -> int:
-    """Internal helper to get last inserted ID."""
-    with sqlite3.connect(db.db_path) as conn:
-        return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
\ No newline at end of file
+    """
+    Retrieve transactions with optional filters, all evaluated in SQL.
+    Extra keyword filters (tx_type, min_amount, max_amount, description,
+    columns, order_by, descending, limit, offset) are passed to
+    ExpenseDatabase.query_transactions.
+    """
+    return resolve_db(db).query_transactions(start_date, end_date, category, **filters)
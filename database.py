@@ -1,13 +1,239 @@
+import csv
+import gzip
+import io
+import math
+import queue
+import re
 import sqlite3
+import threading
+from datetime import date as Date
+from itertools import islice
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from core.events import LEDGER_CHANGED, TRANSACTIONS_ADDED, TRANSACTIONS_REMOVED, events
+from core.periods import date_key
+from migrations import migrate, rollup_rebuild_sql, schema_version
+
+DEFAULT_DB_PATH = "resources/data.db"
+
+# Applied once to every connection when it is opened.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+)
+
+# Insert column order; tuples passed to add_transactions follow it.
+TX_COLUMNS = ("date", "amount", "category", "description", "type")
+TX_TYPES = ("income", "expense")
+QUERY_COLUMNS = ("id",) + TX_COLUMNS
+# Rows are stored with the category name swapped for categories.id.
+_INSERT_SQL = ("INSERT INTO transactions(date, amount, category_id, description, type) "
+               "VALUES(?,?,?,?,?)")
+_INSERT_WITH_ID_SQL = ("INSERT INTO transactions(id, date, amount, category_id, description, type) "
+                       "VALUES(?,?,?,?,?,?)")
+_UPSERT_BUDGET_SQL = """
+    INSERT INTO budgets(category, monthly_limit)
+    VALUES(?,?)
+    ON CONFLICT(category) DO UPDATE
+      SET monthly_limit = excluded.monthly_limit
+"""
+
+# Amounts are stored as integer minor units (cents) and summed exactly in
+# SQL; the Python API takes and returns currency units.
+MINOR_UNITS = 100
+_MAX_AMOUNT = 2**63 / MINOR_UNITS / 1024  # leaves headroom for summing in int64
+
+Row = Tuple[str, float, str, str, str]
+RowSource = Union[pd.DataFrame, io.TextIOBase, Iterable[Union[dict, Sequence[Any]]]]
+
+def _pyarrow():
+    """Import pyarrow on first use; it is only needed for Parquet/Arrow export and import."""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow support requires pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+def to_cents(amount: Any) -> Any:
+    """
+    Currency units to integer cents, rounding half away from zero like
+    SQLite's ROUND(). Accepts a scalar or an array-like (returns int64 array).
+    """
+    if np.ndim(amount):
+        values = np.asarray(amount, dtype=np.float64)
+        return (np.sign(values) * np.floor(np.abs(values) * MINOR_UNITS + 0.5)).astype(np.int64)
+    cents = math.floor(abs(float(amount)) * MINOR_UNITS + 0.5)
+    return -cents if amount < 0 else cents
+
+def from_cents(cents: Any) -> Any:
+    """Integer cents (scalar or array) to currency units."""
+    return cents / MINOR_UNITS
+
+_CENTS = repr(float(MINOR_UNITS))  # SQL divisor: "100.0" makes the division real
+
+def _units(expr: str) -> str:
+    """SQL for an integer cents expression converted to currency units."""
+    return f"({expr}) / {_CENTS}"
+
+# QUERY_COLUMNS as read from the ledger view, amounts in currency units.
+_QUERY_SELECT = ", ".join(f"{_units('amount')} AS amount" if c == "amount" else c
+                          for c in QUERY_COLUMNS)
+
+def signed_amount(amount: float, tx_type: str) -> float:
+    """Expenses are stored negative, income positive."""
+    return -abs(float(amount)) if tx_type == "expense" else abs(float(amount))
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def normalize_row(row: Union[dict, Sequence[Any]], n: int) -> Row:
+    """Validate one input row and return it as an insert tuple. n is the 1-based row number."""
+    if isinstance(row, dict):
+        values = [row.get(col) for col in TX_COLUMNS]
+    else:
+        values = list(row)
+        if len(values) != len(TX_COLUMNS):
+            raise ValueError(f"Row {n}: expected {len(TX_COLUMNS)} fields, got {len(values)}")
+    d, amount, category, description, typ = values
+    if hasattr(d, "strftime"):
+        d = d.strftime("%Y-%m-%d")
+    try:
+        # fromisoformat alone also takes ISO week dates such as "2025-W01-1".
+        if not _DATE_RE.fullmatch(d):
+            raise ValueError
+        Date.fromisoformat(d)
+    except (TypeError, ValueError):
+        raise ValueError(f"Row {n}: invalid date {d!r}, expected YYYY-MM-DD") from None
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError(f"Row {n}: invalid amount {amount!r}") from None
+    if not math.isfinite(amount) or abs(amount) >= _MAX_AMOUNT:
+        raise ValueError(f"Row {n}: invalid amount {amount!r}")
+    if not isinstance(category, str) or not category.strip():
+        raise ValueError(f"Row {n}: category cannot be empty")
+    if description is None or (isinstance(description, float) and math.isnan(description)):
+        description = ""
+    if typ not in TX_TYPES:
+        raise ValueError(f"Row {n}: type must be one of {TX_TYPES}, got {typ!r}")
+    return (d, amount, category.strip(), str(description), typ)
+
+def _iter_rows(source: RowSource) -> Iterator[Union[dict, Sequence[Any]]]:
+    """Yield raw rows from a DataFrame, a CSV text stream or an iterable of dicts/tuples."""
+    if isinstance(source, pd.DataFrame):
+        df = source.copy()
+        if "description" not in df.columns:
+            df["description"] = ""
+        missing = [col for col in TX_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing columns: {missing}")
+        return df[list(TX_COLUMNS)].itertuples(index=False, name=None)
+    if hasattr(source, "read"):
+        return csv.DictReader(source)
+    return iter(source)
+
+class _Lease:
+    """Thread-local holder that hands its connection back to the pool when the thread exits."""
+    def __init__(self, pool: "ConnectionManager", conn: sqlite3.Connection):
+        self.pool = pool
+        self.conn: Optional[sqlite3.Connection] = conn
+
+    def checkin(self) -> None:
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            self.pool._checkin(conn)
+
+    def __del__(self) -> None:
+        self.checkin()
+
+class ConnectionManager:
+    """
+    Hand out long-lived SQLite connections, one per thread.
+    When a thread exits (or calls release()) its connection goes back to a
+    bounded idle pool so short-lived worker threads reuse already-tuned
+    connections; connections beyond `max_idle` are closed.
+    """
+    def __init__(self, db_path: Path, max_idle: int = 8, timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._local = threading.local()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._open: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._open.add(conn)
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn not in self._open:  # closed by close_all()
+                return
+            keep = self._idle.qsize() < self.max_idle
+            if not keep:
+                self._open.discard(conn)
+        if keep:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def get(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, reusing an idle one if available."""
+        lease = getattr(self._local, "lease", None)
+        if lease is not None and lease.conn is not None:
+            return lease.conn
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        self._local.lease = _Lease(self, conn)
+        return conn
+
+    def release(self) -> None:
+        """Return the calling thread's connection to the idle pool."""
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            lease.checkin()
+
+    def close_all(self) -> None:
+        """Close every connection opened by this manager."""
+        with self._lock:
+            conns, self._open = self._open, set()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
 
 class ExpenseDatabase:
-    def __init__(self, db_path: str = "resources/data.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, pool_size: int = 8):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = ConnectionManager(self.db_path, max_idle=pool_size)
+        self._category_ids: Dict[str, int] = {}
         self._init_db()
+
+    def release(self) -> None:
+        """Give the current thread's connection back to the pool (for worker threads)."""
+        self._pool.release()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._pool.close_all()
         
     def clear_all(self) -> None:
         """Delete all rows from transactions and budgets."""
@@ -15,86 +241,733 @@ class ExpenseDatabase:
             conn.execute("DELETE FROM transactions")
             conn.execute("DELETE FROM budgets")
             conn.commit()
+        self._changed(None, budgets=True)
+
+    def _changed(self, changed: Optional[Set[Tuple[str, str]]], budgets: bool = False,
+                 added: Sequence[dict] = (), removed: Sequence[dict] = ()) -> None:
+        """
+        Announce a committed write: the (month, category) pairs of the
+        transactions it touched (None if any may have changed), whether
+        budgets changed, and the rows added or removed.
+        """
+        events.emit(LEDGER_CHANGED, changed=changed, budgets=budgets, db=self)
+        if added:
+            events.emit(TRANSACTIONS_ADDED, rows=list(added), db=self)
+        if removed:
+            events.emit(TRANSACTIONS_REMOVED, rows=list(removed), db=self)
+
+    @staticmethod
+    def _added_rows(rows: List[Row], first_id: int) -> List[dict]:
+        """TRANSACTIONS_ADDED payload for normalized rows inserted with consecutive ids."""
+        return [dict(zip(TX_COLUMNS, row), id=tx_id) for tx_id, row in enumerate(rows, first_id)]
 
     def _get_conn(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        # Pooled, long-lived connection; `with` commits/rolls back but does not close it.
+        return self._pool.get()
 
     def _init_db(self) -> None:
+        migrate(self._get_conn())
+
+    def schema_version(self) -> int:
+        return schema_version(self._get_conn())
+
+    def explain(self, sql: str, params: Sequence[Any] = ()) -> list:
+        """Return the EXPLAIN QUERY PLAN detail lines for a query."""
         with self._get_conn() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    description TEXT,
-                    type TEXT CHECK(type IN ('income','expense'))
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS budgets (
-                    category TEXT PRIMARY KEY,
-                    monthly_limit REAL NOT NULL
-                )
-            """)
-
-    def add_transaction(self, data: Union[dict, pd.DataFrame]) -> None:
-        if isinstance(data, dict):
-            df = pd.DataFrame([data])
-        elif isinstance(data, pd.Series):
-            df = data.to_frame().T
-        else:
-            df = data.copy()
-        for col in ("date","amount","category","description","type"):
-            if col not in df.columns:
-                df[col] = "" if col=="description" else None
-        df = df[["date","amount","category","description","type"]]
+            return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def add_transaction(self, data: Union[dict, pd.Series, pd.DataFrame]) -> int:
+        """
+        Insert one transaction and return its ID, read from the inserting cursor.
+        A DataFrame is bulk inserted and the ID of its last row is returned.
+        """
+        if isinstance(data, pd.DataFrame):
+            if data.empty:
+                raise ValueError("Cannot add a transaction from an empty DataFrame")
+            return self.add_transactions(data)[-1]
+        if isinstance(data, pd.Series):
+            data = data.to_dict()
+        pending: Dict[str, int] = {}
+        row = normalize_row(data, 1)
         with self._get_conn() as conn:
-            df.to_sql("transactions", conn, if_exists="append", index=False)
+            tx_id = conn.execute(_INSERT_SQL, self._encode_rows(conn, [row], pending)[0]).lastrowid
+        self._category_ids.update(pending)
+        self._changed({(row[0][:7], row[2])}, added=self._added_rows([row], tx_id))
+        return tx_id
+
+    def _encode_rows(self, conn: sqlite3.Connection, rows: List[Row],
+                     pending: Dict[str, int]) -> list:
+        """
+        Turn normalized rows into stored form: amounts in cents and category
+        names swapped for categories.id, creating missing categories.
+        New ids go to `pending` and are only cached once the caller commits.
+        """
+        known = self._category_ids
+        for name in {r[2] for r in rows} - known.keys() - pending.keys():
+            conn.execute("INSERT OR IGNORE INTO categories(name) VALUES(?)", (name,))
+            pending[name] = conn.execute(
+                "SELECT id FROM categories WHERE name=?", (name,)
+            ).fetchone()[0]
+        return [(d, to_cents(amount), known[c] if c in known else pending[c], desc, typ)
+                for d, amount, c, desc, typ in rows]
+
+    def add_transactions(self, rows: RowSource, chunk_size: int = 10000) -> range:
+        """
+        Bulk insert transactions in a single transaction using batched executemany.
+        rows may be a DataFrame, a CSV text stream with a header row, or an
+        iterable of dicts / (date, amount, category, description, type) tuples.
+        Every row is validated; any invalid row rolls back the whole batch.
+        Returns the range of assigned IDs.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        normalized = (normalize_row(row, n) for n, row in enumerate(_iter_rows(rows), 1))
+        first_id, count = 0, 0
+        pending: Dict[str, int] = {}
+        changed: Set[Tuple[str, str]] = set()
+        # Rows are only kept for the event when someone listens for them.
+        added: Optional[List[Row]] = [] if events.has_subscribers(TRANSACTIONS_ADDED) else None
+        with self._get_conn() as conn:
+            while True:
+                chunk = list(islice(normalized, chunk_size))
+                if not chunk:
+                    break
+                changed.update((r[0][:7], r[2]) for r in chunk)
+                if added is not None:
+                    added += chunk
+                conn.executemany(_INSERT_SQL, self._encode_rows(conn, chunk, pending))
+                if not count:
+                    # The write lock is held from the first insert, so IDs are contiguous.
+                    last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last - len(chunk) + 1
+                count += len(chunk)
+        self._category_ids.update(pending)
+        if changed:
+            self._changed(changed, added=self._added_rows(added or [], first_id))
+        return range(first_id, first_id + count)
+
+    def delete_transaction(self, tx_id: int) -> bool:
+        return self.pop_transaction(tx_id) is not None
+
+    def pop_transaction(self, tx_id: int) -> Optional[dict]:
+        """Delete a transaction and return the deleted row, or None if it did not exist."""
+        with self._get_conn() as conn:
+            row = conn.execute(
+                f"SELECT {_QUERY_SELECT} FROM ledger WHERE id = ?", (tx_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            # A concurrent caller may have deleted it since the read; only the one
+            # whose DELETE removed the row reports it.
+            if conn.execute("DELETE FROM transactions WHERE id = ?", (tx_id,)).rowcount == 0:
+                return None
+        row = dict(zip(QUERY_COLUMNS, row))
+        self._changed({(str(row["date"])[:7], row["category"])}, removed=[row])
+        return row
+
+    def page_transactions(self, after_id: int = 0, limit: int = 500,
+                          until_id: Optional[int] = None) -> list:
+        """
+        Keyset pagination: up to `limit` rows with id > after_id (and
+        id <= until_id if given), ordered by id, as tuples in QUERY_COLUMNS order.
+        """
+        until = "" if until_id is None else "AND id <= ? "
+        params = (after_id,) + (() if until_id is None else (until_id,)) + (limit,)
+        with self._get_conn() as conn:
+            return conn.execute(
+                f"SELECT {_QUERY_SELECT} FROM ledger "
+                f"WHERE id > ? {until}ORDER BY id LIMIT ?", params
+            ).fetchall()
 
     def get_transactions(self,
                          start_date: Optional[str]=None,
                          end_date:   Optional[str]=None
                         ) -> pd.DataFrame:
-        sql = "SELECT * FROM transactions"
-        params = []
-        if start_date or end_date:
-            cond = []
-            if start_date:
-                cond.append("date>=?"); params.append(start_date)
-            if end_date:
-                cond.append("date<=?"); params.append(end_date)
-            sql += " WHERE " + " AND ".join(cond)
-        with self._get_conn() as conn:
-            return pd.read_sql(sql, conn, params=params or None, parse_dates=["date"])
+        return self.query_transactions(start_date=start_date, end_date=end_date)
+
+    def _tx_filter(self,
+                   start_date:  Optional[str]=None,
+                   end_date:    Optional[str]=None,
+                   category:    Optional[Union[str, Sequence[str]]]=None,
+                   tx_type:     Optional[str]=None,
+                   min_amount:  Optional[float]=None,
+                   max_amount:  Optional[float]=None,
+                   description: Optional[str]=None
+                  ) -> Tuple[str, list]:
+        """WHERE clause and parameters for transaction filters; valid on transactions and ledger."""
+        cond, params = [], []
+        if start_date:
+            cond.append("date_key>=?"); params.append(date_key(start_date))
+        if end_date:
+            cond.append("date_key<=?"); params.append(date_key(end_date))
+        if category is not None:
+            cats = [category] if isinstance(category, str) else list(category)
+            cond.append("category_id IN (SELECT id FROM categories "
+                        f"WHERE name IN ({', '.join('?' * len(cats))}))"); params.extend(cats)
+        if tx_type is not None:
+            cond.append("type=?"); params.append(tx_type)
+        if min_amount is not None:
+            cond.append("amount>=?"); params.append(min_amount * MINOR_UNITS)
+        if max_amount is not None:
+            cond.append("amount<=?"); params.append(max_amount * MINOR_UNITS)
+        if description:
+            escaped = description.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            cond.append("description LIKE ? ESCAPE '\\'"); params.append(f"%{escaped}%")
+        return (" WHERE " + " AND ".join(cond) if cond else ""), params
+
+    def query_transactions(self,
+                           start_date:  Optional[str]=None,
+                           end_date:    Optional[str]=None,
+                           category:    Optional[Union[str, Sequence[str]]]=None,
+                           tx_type:     Optional[str]=None,
+                           min_amount:  Optional[float]=None,
+                           max_amount:  Optional[float]=None,
+                           description: Optional[str]=None,
+                           columns:     Optional[Sequence[str]]=None,
+                           order_by:    str="id",
+                           descending:  bool=False,
+                           limit:       Optional[int]=None,
+                           offset:      Optional[int]=None
+                          ) -> pd.DataFrame:
+        """
+        Select transactions with every filter evaluated in SQL.
+        category may be a single name or a list; description matches a
+        case-insensitive substring; columns projects the result (default: all).
+        """
+        cols = list(columns) if columns else list(QUERY_COLUMNS)
+        for col in cols + [order_by]:
+            if col not in QUERY_COLUMNS:
+                raise ValueError(f"Unknown column {col!r}")
+        where, params = self._tx_filter(start_date, end_date, category, tx_type,
+                                        min_amount, max_amount, description)
+        # Read category ids rather than names; they are decoded to a Categorical below.
+        select = ["category_id AS category" if c == "category" else
+                  f"{_units('amount')} AS amount" if c == "amount" else c for c in cols]
+        sql = f"SELECT {', '.join(select)} FROM transactions{where}"
+        order = "(SELECT name FROM categories WHERE id = category_id)" \
+            if order_by == "category" else order_by
+        sql += f" ORDER BY {order} {'DESC' if descending else 'ASC'}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"; params += [-1 if limit is None else limit, offset or 0]
+        with self._get_conn() as conn:
+            df = pd.read_sql(sql, conn, params=params or None,
+                             parse_dates=["date"] if "date" in cols else None)
+            if "category" in cols:
+                df["category"] = self._decode_categories(conn, df["category"].to_numpy())
+        if "type" in cols:
+            df["type"] = pd.Categorical(df["type"], categories=TX_TYPES)
+        return df
+
+    def _category_codes(self, conn: sqlite3.Connection) -> Tuple[List[str], np.ndarray]:
+        """Sorted category names and an array mapping categories.id to the name's position."""
+        table = conn.execute("SELECT id, name FROM categories ORDER BY name").fetchall()
+        cat_ids = np.array([r[0] for r in table], dtype=np.int64)
+        codes_by_id = np.full(int(cat_ids.max(initial=0)) + 1, -1, dtype=np.int32)
+        codes_by_id[cat_ids] = np.arange(len(cat_ids), dtype=np.int32)
+        return [r[1] for r in table], codes_by_id
+
+    def _decode_categories(self, conn: sqlite3.Connection, ids: np.ndarray) -> pd.Categorical:
+        """Map categories.id values to a Categorical of names without building name strings per row."""
+        names, codes_by_id = self._category_codes(conn)
+        return pd.Categorical.from_codes(codes_by_id[ids.astype(np.int64)], categories=names)
 
     def set_budget(self, category: str, limit: float) -> None:
         with self._get_conn() as conn:
-            conn.execute("""
-                INSERT INTO budgets(category, monthly_limit)
-                VALUES(?,?)
-                ON CONFLICT(category) DO UPDATE
-                  SET monthly_limit = excluded.monthly_limit
-            """, (category, limit))
+            conn.execute(_UPSERT_BUDGET_SQL, (category, to_cents(limit)))
+        self._changed(set(), budgets=True)
+
+    def delete_budget(self, category: str) -> bool:
+        with self._get_conn() as conn:
+            deleted = conn.execute(
+                "DELETE FROM budgets WHERE category = ?", (category,)
+            ).rowcount > 0
+        if deleted:
+            self._changed(set(), budgets=True)
+        return deleted
 
     def get_budgets(self) -> pd.DataFrame:
         with self._get_conn() as conn:
-            return pd.read_sql("SELECT category, monthly_limit FROM budgets", conn)
+            return pd.read_sql(
+                f"SELECT category, {_units('monthly_limit')} AS monthly_limit FROM budgets", conn
+            )
 
-    def get_spending_summary(self) -> pd.DataFrame:
+    def _month_filter(self, start_month: Optional[str], end_month: Optional[str]) -> Tuple[str, list]:
+        cond, params = [], []
+        if start_month:
+            cond.append("month>=?"); params.append(start_month)
+        if end_month:
+            cond.append("month<=?"); params.append(end_month)
+        return (" WHERE " + " AND ".join(cond) if cond else ""), params
+
+    def sum_by_type(self,
+                    start_month: Optional[str]=None,
+                    end_month:   Optional[str]=None
+                   ) -> Dict[str, float]:
+        """Return {"income": total, "expense": total} for the "YYYY-MM" month range."""
+        where, params = self._month_filter(start_month, end_month)
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT type, SUM(total) FROM monthly_category_totals{where} GROUP BY type",
+                params
+            ).fetchall()
+        totals = {t: 0.0 for t in TX_TYPES}
+        totals.update((t, from_cents(cents)) for t, cents in rows)
+        return totals
+
+    def sum_by_category(self,
+                        start_month: Optional[str]=None,
+                        end_month:   Optional[str]=None
+                       ) -> pd.DataFrame:
+        """Return per-category income and expense totals, sorted by category."""
+        where, params = self._month_filter(start_month, end_month)
+        sql = f"""
+            SELECT category,
+                   SUM(CASE WHEN type='income'  THEN total ELSE 0 END) / {_CENTS} AS income,
+                   SUM(CASE WHEN type='expense' THEN total ELSE 0 END) / {_CENTS} AS expense
+            FROM monthly_category_totals{where}
+            GROUP BY category ORDER BY category
+        """
+        with self._get_conn() as conn:
+            return pd.read_sql(sql, conn, params=params or None)
+
+    def monthly_totals(self,
+                       start_month: Optional[str]=None,
+                       end_month:   Optional[str]=None
+                      ) -> pd.DataFrame:
+        """Return income and expense per "YYYY-MM" month that has transactions."""
+        where, params = self._month_filter(start_month, end_month)
+        sql = f"""
+            SELECT month,
+                   SUM(CASE WHEN type='income'  THEN total ELSE 0 END) / {_CENTS} AS income,
+                   SUM(CASE WHEN type='expense' THEN total ELSE 0 END) / {_CENTS} AS expense
+            FROM monthly_category_totals{where}
+            GROUP BY month ORDER BY month
+        """
+        with self._get_conn() as conn:
+            return pd.read_sql(sql, conn, params=params or None)
+
+    def category_month_totals(self,
+                              start_month: Optional[str]=None,
+                              end_month:   Optional[str]=None
+                             ) -> pd.DataFrame:
+        """Return income and expense per month and category, sorted by month then category."""
+        where, params = self._month_filter(start_month, end_month)
+        sql = f"""
+            SELECT month, category,
+                   SUM(CASE WHEN type='income'  THEN total ELSE 0 END) / {_CENTS} AS income,
+                   SUM(CASE WHEN type='expense' THEN total ELSE 0 END) / {_CENTS} AS expense
+            FROM monthly_category_totals{where}
+            GROUP BY month, category ORDER BY month, category
+        """
+        with self._get_conn() as conn:
+            return pd.read_sql(sql, conn, params=params or None)
+
+    def list_months(self) -> List[str]:
+        """Every "YYYY-MM" month that has transactions, ascending."""
+        with self._get_conn() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT DISTINCT month FROM monthly_category_totals ORDER BY month"
+            )]
+
+    def list_categories(self) -> List[str]:
+        """Every category used by a transaction or a budget, sorted."""
+        with self._get_conn() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT category FROM monthly_category_totals "
+                "UNION SELECT category FROM budgets ORDER BY 1"
+            )]
+
+    def has_month(self, month: str) -> bool:
+        """True if any transaction falls in the "YYYY-MM" month."""
+        with self._get_conn() as conn:
+            return bool(conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM monthly_category_totals WHERE month=?)", (month,)
+            ).fetchone()[0])
+
+    def has_category(self, category: str) -> bool:
+        """True if the category is used by a transaction or a budget."""
+        with self._get_conn() as conn:
+            return bool(conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM monthly_category_totals WHERE category=?) "
+                "OR EXISTS(SELECT 1 FROM budgets WHERE category=?)", (category, category)
+            ).fetchone()[0])
+
+    def rebuild_rollup(self) -> None:
+        """Recompute monthly_category_totals from the transactions table."""
+        with self._get_conn() as conn:
+            for sql in rollup_rebuild_sql():
+                conn.execute(sql)
+
+    def check_rollup(self) -> pd.DataFrame:
+        """
+        Compare monthly_category_totals with a fresh aggregation of transactions.
+        Returns the mismatching (month, category, type) rows; empty if consistent.
+        Rows the rollup cannot bucket come first with a null month: transactions
+        whose date strftime cannot read, and any quarantined_transactions.
+        """
+        quarantined = ""
         with self._get_conn() as conn:
-            spending = pd.read_sql(
-                "SELECT category, SUM(amount) AS expense "
-                "FROM transactions WHERE type='expense' GROUP BY category",
-                conn
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' "
+                            "AND name='quarantined_transactions'").fetchone():
+                quarantined = """
+                    UNION ALL
+                    SELECT NULL, category, type, NULL, SUM(amount), NULL, COUNT(*)
+                    FROM quarantined_transactions GROUP BY 2, 3
+                """
+        sql = f"""
+            WITH actual AS (
+                SELECT strftime('%Y-%m', date) AS month, category, type,
+                       SUM(amount) AS total, COUNT(*) AS count
+                FROM ledger WHERE type IN ('income','expense')
+                GROUP BY 1, 2, 3
+            ), keys AS (
+                SELECT month, category, type FROM actual
+                UNION
+                SELECT month, category, type FROM monthly_category_totals
             )
-            budgets = pd.read_sql("SELECT category, monthly_limit FROM budgets", conn)
-        merged = pd.merge(budgets, spending, on="category", how="left").fillna(0)
-        merged["remaining"] = merged["monthly_limit"] + merged["expense"]
-        return merged[["category","expense","monthly_limit","remaining"]]
+            SELECT k.month, k.category, k.type,
+                   {_units("r.total")} AS rollup_total, {_units("a.total")} AS actual_total,
+                   r.count AS rollup_count, a.count AS actual_count
+            FROM keys k
+            LEFT JOIN actual a USING (month, category, type)
+            LEFT JOIN monthly_category_totals r USING (month, category, type)
+            WHERE r.count IS NOT a.count OR r.total IS NOT a.total
+            {quarantined}
+            ORDER BY 1, 2, 3
+        """
+        with self._get_conn() as conn:
+            return pd.read_sql(sql, conn)
+
+    def get_budget(self, category: str) -> Optional[float]:
+        """Return the monthly limit for one category, or None if it has no budget."""
+        with self._get_conn() as conn:
+            row = conn.execute(
+                "SELECT monthly_limit FROM budgets WHERE category = ?", (category,)
+            ).fetchone()
+        return from_cents(row[0]) if row else None
+
+    def budget_status(self,
+                      month:     Optional[str]=None,
+                      category:  Optional[str]=None,
+                      threshold: Optional[float]=None
+                     ) -> pd.DataFrame:
+        """
+        Budgets with their spending, in one query: category, expense,
+        monthly_limit, remaining. Spending covers one "YYYY-MM" month, or all
+        time when month is None. category restricts to one budget and
+        threshold keeps rows with remaining <= threshold; both filter in SQL.
+        """
+        spent = ("SELECT SUM(total) FROM monthly_category_totals r "
+                 "WHERE r.category = b.category AND r.type = 'expense'")
+        params: list = []
+        if month:
+            spent += " AND r.month = ?"; params.append(month)
+        sql = f"""
+            SELECT category, {_units("expense")} AS expense,
+                   {_units("monthly_limit")} AS monthly_limit,
+                   {_units("monthly_limit + expense")} AS remaining
+            FROM (SELECT b.category, COALESCE(({spent}), 0) AS expense, b.monthly_limit
+                  FROM budgets b{" WHERE b.category = ?" if category is not None else ""})
+        """
+        if category is not None:
+            params.append(category)
+        if threshold is not None:
+            sql += " WHERE monthly_limit + expense <= ?"; params.append(threshold * MINOR_UNITS)
+        sql += " ORDER BY category"
+        with self._get_conn() as conn:
+            return pd.read_sql(sql, conn, params=params or None)
+
+    def snapshot(self) -> "LedgerSnapshot":
+        """
+        Load the ledger into a read-only in-memory core.snapshot.LedgerSnapshot
+        that answers the report queries without touching the disk.
+        """
+        from core.snapshot import LedgerSnapshot
+        return LedgerSnapshot(self)
 
-    def export_to_csv(self, filepath: str) -> None:
-        df = self.get_transactions().drop(columns=["description"])  # drop empty column
+    def get_spending_summary(self) -> pd.DataFrame:
+        """Every budget with its all-time spending and what remains."""
+        return self.budget_status()
+
+    def export_to_csv(self,
+                      filepath:   str,
+                      start_date: Optional[str]=None,
+                      end_date:   Optional[str]=None,
+                      category:   Optional[Union[str, Sequence[str]]]=None,
+                      chunk_size: int=50000,
+                      compress:   Optional[bool]=None
+                     ) -> int:
+        """
+        Stream transactions (without descriptions) to CSV, fetching chunk_size
+        rows at a time from the cursor so memory stays constant regardless of
+        ledger size. Output is gzip-compressed when compress is True, or when
+        it is None and filepath ends in ".gz". Returns the number of rows written.
+        """
+        columns = ["id", "date", "amount", "category", "type"]
+        select = [f"{_units('amount')} AS amount" if c == "amount" else c for c in columns]
+        where, params = self._tx_filter(start_date, end_date, category)
         out = Path(filepath)
         out.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(out, index=False)
\ No newline at end of file
+        if compress is None:
+            compress = out.suffix == ".gz"
+        opener = gzip.open if compress else open
+        written = 0
+        with opener(out, "wt", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            cur = self._get_conn().execute(
+                f"SELECT {', '.join(select)} FROM ledger{where} ORDER BY id", params
+            )
+            try:
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+                    written += len(rows)
+            finally:
+                cur.close()
+        return written
+
+
+    def _arrow_schema(self, partitioned: bool = False):
+        pa = _pyarrow()
+        fields = [
+            ("id", pa.int64()),
+            ("date", pa.date32()),
+            ("amount", pa.float64()),
+            ("category", pa.dictionary(pa.int32(), pa.string())),
+            ("description", pa.string()),
+            ("type", pa.dictionary(pa.int8(), pa.string())),
+        ]
+        if partitioned:
+            fields += [("year", pa.int16()), ("month", pa.int8())]
+        return pa.schema(fields)
+
+    def _arrow_batches(self,
+                       start_date: Optional[str]=None,
+                       end_date:   Optional[str]=None,
+                       category:   Optional[Union[str, Sequence[str]]]=None,
+                       chunk_size: int=100000,
+                       partitioned: bool=False
+                      ) -> Iterator[Any]:
+        """
+        Yield transactions as typed Arrow record batches of up to chunk_size rows.
+        Every batch shares one category dictionary, as the IPC file format requires.
+        """
+        pa = _pyarrow()
+        schema = self._arrow_schema(partitioned)
+        where, params = self._tx_filter(start_date, end_date, category)
+        conn = self._get_conn()
+        names, codes_by_id = self._category_codes(conn)
+        categories = pa.array(names, pa.string())
+        types = pa.array(TX_TYPES, pa.string())
+        # Days since 1970-01-01 is the date32 representation.
+        cur = conn.execute(f"""
+            SELECT id, CAST(julianday(date) - 2440587.5 AS INTEGER), {_units("amount")}, category_id,
+                   description, type = 'expense', date_key
+            FROM transactions{where} ORDER BY id
+        """, params)
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ids, days, amounts, cat_ids, descriptions, is_expense, keys = zip(*rows)
+                columns = [
+                    pa.array(ids, pa.int64()),
+                    pa.array(np.array(days, dtype=np.int32)).cast(pa.date32()),
+                    pa.array(amounts, pa.float64()),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(codes_by_id[np.array(cat_ids, dtype=np.int64)]), categories
+                    ),
+                    pa.array(descriptions, pa.string()),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(np.array(is_expense, dtype=np.int8)), types
+                    ),
+                ]
+                if partitioned:
+                    keys = np.array(keys, dtype=np.int32)
+                    columns += [pa.array((keys // 10000).astype(np.int16)),
+                                pa.array((keys // 100 % 100).astype(np.int8))]
+                yield pa.RecordBatch.from_arrays(columns, schema=schema)
+        finally:
+            cur.close()
+
+    def _budgets_table(self):
+        pa = _pyarrow()
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT category, {_units('monthly_limit')} FROM budgets ORDER BY category"
+            ).fetchall()
+        return pa.table({
+            "category": pa.array([r[0] for r in rows], pa.string()),
+            "monthly_limit": pa.array([r[1] for r in rows], pa.float64()),
+        })
+
+    def export_parquet(self,
+                       directory:  str,
+                       start_date: Optional[str]=None,
+                       end_date:   Optional[str]=None,
+                       category:   Optional[Union[str, Sequence[str]]]=None,
+                       chunk_size: int=100000
+                      ) -> int:
+        """
+        Write transactions to directory/transactions as a Parquet dataset
+        partitioned by year=YYYY/month=M, and budgets to directory/budgets.parquet.
+        chunk_size is also the target row-group size. Existing partitions being
+        written are replaced. Returns the number of transactions.
+        """
+        pa = _pyarrow()
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        written = 0
+        def counted(batches: Iterator[Any]) -> Iterator[Any]:
+            nonlocal written
+            for batch in batches:
+                written += batch.num_rows
+                yield batch
+        schema = self._arrow_schema(partitioned=True)
+        pa.dataset.write_dataset(
+            counted(self._arrow_batches(start_date, end_date, category, chunk_size, True)),
+            out / "transactions", schema=schema, format="parquet",
+            partitioning=pa.dataset.partitioning(
+                pa.schema([schema.field("year"), schema.field("month")]), flavor="hive"
+            ),
+            basename_template="part-{i}.parquet", existing_data_behavior="delete_matching",
+            # Buffer per partition so each month gets full row groups, not batch slivers.
+            min_rows_per_group=chunk_size, max_rows_per_group=max(chunk_size, 1 << 20),
+        )
+        pa.parquet.write_table(self._budgets_table(), out / "budgets.parquet")
+        return written
+
+    def export_arrow(self,
+                     directory:  str,
+                     start_date: Optional[str]=None,
+                     end_date:   Optional[str]=None,
+                     category:   Optional[Union[str, Sequence[str]]]=None,
+                     chunk_size: int=100000
+                    ) -> int:
+        """
+        Write transactions and budgets to directory/transactions.arrow and
+        directory/budgets.arrow as uncompressed Arrow IPC files, which readers
+        can memory-map without copying. Returns the number of transactions.
+        """
+        pa = _pyarrow()
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with pa.OSFile(str(out / "transactions.arrow"), "wb") as sink, \
+                pa.ipc.new_file(sink, self._arrow_schema()) as writer:
+            for batch in self._arrow_batches(start_date, end_date, category, chunk_size):
+                writer.write_batch(batch)
+                written += batch.num_rows
+        budgets = self._budgets_table()
+        with pa.OSFile(str(out / "budgets.arrow"), "wb") as sink, \
+                pa.ipc.new_file(sink, budgets.schema) as writer:
+            writer.write_table(budgets)
+        return written
+
+    def import_parquet(self, directory: str, replace: bool = False) -> int:
+        """
+        Load a directory written by export_parquet. With replace=True the
+        current transactions and budgets are replaced and transaction IDs are
+        kept; otherwise rows are appended with new IDs and budgets are upserted.
+        Returns the number of transactions imported.
+        """
+        pa = _pyarrow()
+        src = Path(directory)
+        dataset = pa.dataset.dataset(
+            src / "transactions", format="parquet", partitioning="hive"
+        ) if (src / "transactions").exists() else None
+        batches = dataset.to_batches() if dataset is not None else ()
+        budgets = pa.parquet.read_table(src / "budgets.parquet") \
+            if (src / "budgets.parquet").exists() else None
+        return self._import_arrow(batches, budgets, replace)
+
+    def import_arrow(self, directory: str, replace: bool = False) -> int:
+        """
+        Load a directory written by export_arrow, reading both files through
+        memory maps. replace behaves as in import_parquet.
+        Returns the number of transactions imported.
+        """
+        pa = _pyarrow()
+        src = Path(directory)
+        def read(name: str):
+            path = src / name
+            if not path.exists():
+                return None
+            with pa.memory_map(str(path)) as source:
+                return pa.ipc.open_file(source).read_all()
+        transactions = read("transactions.arrow")
+        batches = transactions.to_batches() if transactions is not None else ()
+        return self._import_arrow(batches, read("budgets.arrow"), replace)
+
+    def _import_arrow(self, batches: Iterable[Any], budgets: Optional[Any], replace: bool) -> int:
+        """Insert Arrow transaction batches and a budgets table in one transaction."""
+        pa = _pyarrow()
+        count, first_id = 0, 0
+        pending: Dict[str, int] = {}
+        changed: Set[Tuple[str, str]] = set()
+        # A replace announces a reset (changed=None) instead of rows.
+        added: Optional[List[Row]] = [] if not replace and events.has_subscribers(
+            TRANSACTIONS_ADDED) else None
+        with self._get_conn() as conn:
+            if replace:
+                conn.execute("DELETE FROM transactions")
+                conn.execute("DELETE FROM budgets")
+            for batch in batches:
+                # date32 casts to "YYYY-MM-DD"; dictionaries decode to plain strings.
+                values = [batch.column(col).cast(pa.string()) if col in ("date", "category", "type")
+                          else batch.column(col) for col in TX_COLUMNS]
+                rows = [normalize_row(row, count + n) for n, row in
+                        enumerate(zip(*(col.to_pylist() for col in values)), 1)]
+                changed.update((r[0][:7], r[2]) for r in rows)
+                if added is not None:
+                    added += rows
+                rows = self._encode_rows(conn, rows, pending)
+                if replace:
+                    conn.executemany(_INSERT_WITH_ID_SQL, [
+                        (tx_id,) + row for tx_id, row in zip(batch.column("id").to_pylist(), rows)
+                    ])
+                else:
+                    conn.executemany(_INSERT_SQL, rows)
+                    if rows and not first_id:
+                        # One write transaction throughout, so IDs are contiguous.
+                        last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                        first_id = last - len(rows) + 1
+                count += len(rows)
+            if budgets is not None:
+                conn.executemany(_UPSERT_BUDGET_SQL, zip(
+                    budgets.column("category").to_pylist(),
+                    map(to_cents, budgets.column("monthly_limit").to_pylist())
+                ))
+        self._category_ids.update(pending)
+        self._changed(None if replace else changed, budgets=replace or budgets is not None,
+                      added=self._added_rows(added or [], first_id))
+        return count
+
+_shared_db: Optional[ExpenseDatabase] = None
+_shared_lock = threading.Lock()
+
+def get_db() -> ExpenseDatabase:
+    """
+    The process-wide database handle, opened on first use so importing a
+    module never touches the disk.
+    """
+    global _shared_db
+    if _shared_db is None:
+        with _shared_lock:
+            if _shared_db is None:
+                _shared_db = ExpenseDatabase(DEFAULT_DB_PATH)
+    return _shared_db
+
+def set_db(db: Optional[ExpenseDatabase]) -> Optional[ExpenseDatabase]:
+    """
+    Make `db` the handle get_db() returns (None reopens the default file on
+    next use). Returns the previous handle.
+    """
+    global _shared_db
+    with _shared_lock:
+        previous, _shared_db = _shared_db, db
+    return previous
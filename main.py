@@ -1,29 +1,41 @@
 import sys
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from pathlib import Path
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QFormLayout, QHBoxLayout,
     QVBoxLayout, QLabel, QLineEdit, QComboBox, QDateEdit,
-    QDoubleSpinBox, QPushButton, QTableView, QMessageBox
+    QDoubleSpinBox, QPushButton, QTableView, QMessageBox, QProgressBar
 )
 from PyQt5.QtCore import Qt, QDate
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
-from database import ExpenseDatabase
-from core.tracker import add_expense, add_income, get_transactions, remove_transaction
+from database import QUERY_COLUMNS, get_db
+from core.tracker import add_expense, add_income, remove_transaction
 from core.budget import set_category_budget, list_budgets, remove_category_budget
+from core.alerts import BudgetAlertEngine
+from core.ledgers import same_db
+from core.events import (
+    BUDGET_CHANGED, BUDGET_REMOVED, TRANSACTIONS_ADDED, TRANSACTIONS_REMOVED, events
+)
 from core.reports import (
     generate_monthly_report, generate_category_report,
     generate_budget_report, get_monthly_trend
 )
 
-sns.set_style("whitegrid")
-DB = ExpenseDatabase()
+_sns = None
+
+def _seaborn():
+    """Import seaborn (and with it matplotlib) when the first chart is drawn, not at startup."""
+    global _sns
+    if _sns is None:
+        import seaborn
+        seaborn.set_style("whitegrid")
+        _sns = seaborn
+    return _sns
 
 
 class PandasModel(QtCore.QAbstractTableModel):
@@ -54,29 +66,290 @@ class PandasModel(QtCore.QAbstractTableModel):
                 return str(section)
 
 
+class TransactionTableModel(QtCore.QAbstractTableModel):
+    """
+    Lazily paged view of the transactions table.
+    Rows are fetched on demand with keyset pagination: page i holds the rows
+    with ids in (after[i], after[i+1]]. At most `max_pages` pages of
+    pre-formatted cell strings are kept in memory; evicted pages are re-read
+    by their starting id. rows_added/rows_removed patch the model in place.
+    """
+    def __init__(self, db, page_size=500, max_pages=20, parent=None):
+        super().__init__(parent)
+        self._db = db
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._columns = list(QUERY_COLUMNS)
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._after = []                # page -> id the page starts after
+        self._start = []                # page -> first row number
+        self._length = []               # page -> number of rows
+        self._pages = OrderedDict()     # page -> (ids, formatted rows), LRU order
+        self._rows = 0
+        self._exhausted = False
+        self.endResetModel()
+
+    def _cache_page(self, page, ids, cells):
+        self._pages[page] = (ids, cells)
+        self._pages.move_to_end(page)
+        while len(self._pages) > self._max_pages:
+            self._pages.popitem(last=False)
+        return ids, cells
+
+    def _read_page(self, page):
+        # Bounded by the next page's start, so rows deleted since the page was
+        # evicted are not made up for with rows of the next page.
+        until = self._after[page + 1] if page + 1 < len(self._after) else None
+        return self._db.page_transactions(self._after[page], self._length[page], until)
+
+    def _page(self, page):
+        entry = self._pages.get(page)
+        if entry is not None:
+            self._pages.move_to_end(page)
+            return entry
+        rows = self._read_page(page)
+        return self._cache_page(page, [r[0] for r in rows], [tuple(str(v) for v in r) for r in rows])
+
+    def _locate(self, row):
+        page = bisect_right(self._start, row) - 1
+        return page, row - self._start[page]
+
+    def _last_id(self):
+        if not self._after:
+            return 0
+        ids, _ = self._page(len(self._after) - 1)
+        return ids[-1] if ids else self._after[-1]
+
+    def _append_page(self, after, rows):
+        page = len(self._after)
+        self.beginInsertRows(QtCore.QModelIndex(), self._rows, self._rows + len(rows) - 1)
+        self._after.append(after)
+        self._start.append(self._rows)
+        self._length.append(len(rows))
+        self._cache_page(page, [r[0] for r in rows], [tuple(str(v) for v in r) for r in rows])
+        self._rows += len(rows)
+        self.endInsertRows()
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        after = self._last_id()
+        rows = self._db.page_transactions(after, self._page_size)
+        if len(rows) < self._page_size:
+            self._exhausted = True
+        if rows:
+            self._append_page(after, rows)
+
+    def rows_added(self, rows):
+        """Append newly inserted rows; skipped until the end of the table has been fetched."""
+        if not self._exhausted or not rows:
+            return
+        rows = [tuple(r[c] for c in self._columns) for r in sorted(rows, key=lambda r: r["id"])]
+        last = len(self._after) - 1
+        if last >= 0 and self._length[last] + len(rows) <= self._page_size:
+            ids, cells = self._page(last)
+            self.beginInsertRows(QtCore.QModelIndex(), self._rows, self._rows + len(rows) - 1)
+            ids.extend(r[0] for r in rows)
+            cells.extend(tuple(str(v) for v in r) for r in rows)
+            self._length[last] += len(rows)
+            self._rows += len(rows)
+            self.endInsertRows()
+        else:
+            self._append_page(self._last_id(), rows)
+
+    def rows_removed(self, tx_ids):
+        """Remove rows by transaction ID, if they are loaded."""
+        for tx_id in sorted(tx_ids):
+            page = bisect_left(self._after, tx_id) - 1
+            if page < 0:
+                continue
+            entry = self._pages.get(page)
+            if entry is not None:
+                ids, cells = entry
+                if tx_id not in ids:
+                    continue
+                offset = ids.index(tx_id)
+            else:
+                # Evicted page: the row is already gone from the database, so
+                # it sat where its id sorts among the ids that remain.
+                ids = [r[0] for r in self._read_page(page)]
+                if tx_id in ids or len(ids) >= self._length[page]:
+                    continue
+                offset = bisect_left(ids, tx_id)
+            row = self._start[page] + offset
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            if entry is not None:
+                del ids[offset], cells[offset]
+            self._length[page] -= 1
+            for p in range(page + 1, len(self._start)):
+                self._start[p] -= 1
+            self._rows -= 1
+            self.endRemoveRows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def row_id(self, row):
+        """Return the transaction ID shown in a row."""
+        page, offset = self._locate(row)
+        return self._page(page)[0][offset]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            page, offset = self._locate(index.row())
+            cells = self._page(page)[1]
+            if offset < len(cells):  # rows deleted by another process
+                return cells[offset][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._columns[section]
+            else:
+                return str(section)
+
+
+class WorkerSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(int, object)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class ReportWorker(QtCore.QRunnable):
+    """Run one report computation on a pool thread and signal the result."""
+    def __init__(self, token, fn):
+        super().__init__()
+        self.token = token
+        self.fn = fn
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn()
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self.token, str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.token, result)
+
+
+class ReportRunner(QtCore.QObject):
+    """
+    Submit report computations to a QThreadPool. A new submission supersedes
+    the previous one: it is dequeued if not yet started, and its result is
+    dropped otherwise, so only the latest request reaches the UI.
+    """
+    busy = QtCore.pyqtSignal(bool)
+
+    def __init__(self, pool, on_error, parent=None):
+        super().__init__(parent)
+        self._pool = pool
+        self._on_error = on_error
+        self._token = 0
+        self._worker = None
+        self._on_done = None
+
+    def submit(self, fn, on_done):
+        if self._worker is not None:
+            self._worker.cancelled = True
+            self._pool.tryTake(self._worker)
+        self._token += 1
+        self._on_done = on_done
+        self._worker = ReportWorker(self._token, fn)
+        self._worker.setAutoDelete(False)
+        self._worker.signals.finished.connect(self._finished)
+        self._worker.signals.failed.connect(self._failed)
+        self.busy.emit(True)
+        self._pool.start(self._worker)
+
+    def _finished(self, token, result):
+        if token != self._token:
+            return
+        self._worker = None
+        self.busy.emit(False)
+        try:
+            self._on_done(result)
+        except Exception as e:
+            self._on_error(str(e))
+
+    def _failed(self, token, msg):
+        if token != self._token:
+            return
+        self._worker = None
+        self.busy.emit(False)
+        self._on_error(msg)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Smart Expense Tracker")
         self.resize(900, 600)
 
+        # Reports and chart data are computed off the UI thread
+        self._pool = QtCore.QThreadPool.globalInstance()
+        self._busy = set()
+        self._progress = QProgressBar()
+        self._progress.setRange(0, 0)  # indeterminate
+        self._progress.setMaximumWidth(150)
+        self._progress.hide()
+        self.statusBar().addPermanentWidget(self._progress)
+        self._report_runner = self._make_runner()
+        self._plot_runner = self._make_runner()
+
         tabs = QtWidgets.QTabWidget()
         tabs.addTab(self._make_transactions_tab(), "Transactions")
         tabs.addTab(self._make_budgets_tab(), "Budgets")
         tabs.addTab(self._make_reports_tab(), "Reports")
-        tabs.addTab(self._make_visual_tab(), "Visualization")
+        self._visual_tab = self._make_visual_tab()
+        tabs.addTab(self._visual_tab, "Visualization")
+        tabs.currentChanged.connect(self._on_tab_changed)
+        self._tabs = tabs
         self.setCentralWidget(tabs)
 
         # Populate month/category lists
         self._update_months()
         self._update_categories()
 
+        # Keep views in sync with writes incrementally instead of reloading
+        events.subscribe(TRANSACTIONS_ADDED, self._on_transactions_added)
+        events.subscribe(TRANSACTIONS_REMOVED, self._on_transactions_removed)
+        events.subscribe(BUDGET_CHANGED, self._on_budgets_changed)
+        events.subscribe(BUDGET_REMOVED, self._on_budgets_changed)
+
+        # Budget thresholds are checked as transactions are written
+        self._alerts = BudgetAlertEngine(get_db()).start()
+        self._alerts.on_alert(self._on_budget_alert)
+
     def _show_error(self, msg):
         QMessageBox.critical(self, "Error", msg)
 
+    def _make_runner(self):
+        runner = ReportRunner(self._pool, self._show_error, self)
+        runner.busy.connect(lambda busy, r=runner: self._set_busy(r, busy))
+        return runner
+
+    def _set_busy(self, runner, busy):
+        if busy:
+            self._busy.add(runner)
+        else:
+            self._busy.discard(runner)
+        self._progress.setVisible(bool(self._busy))
+
     def _update_months(self):
-        df = get_transactions()
-        months = sorted(pd.to_datetime(df["date"]).dt.to_period("M").astype(str).unique().tolist())
+        months = get_db().list_months()
         if hasattr(self, "rmonth_cb"):
             current = self.rmonth_cb.currentText()
             self.rmonth_cb.clear()
@@ -91,10 +364,7 @@ class MainWindow(QMainWindow):
                 self.vmonth_cb.setCurrentText(current)
 
     def _update_categories(self):
-        tx_cats = set(get_transactions()["category"].dropna().unique())
-        bg_df = list_budgets()
-        bg_cats = set(bg_df["category"].dropna().unique()) if not bg_df.empty else set()
-        all_cats = sorted(tx_cats | bg_cats)
+        all_cats = get_db().list_categories()
         if hasattr(self, "cat_cb"):
             current = self.cat_cb.currentText()
             self.cat_cb.clear()
@@ -108,6 +378,64 @@ class MainWindow(QMainWindow):
             if current in all_cats:
                 self.bcat_cb.setCurrentText(current)
 
+    def _month_combos(self):
+        return [cb for cb in (getattr(self, "rmonth_cb", None), getattr(self, "vmonth_cb", None)) if cb]
+
+    def _category_combos(self):
+        return [cb for cb in (getattr(self, "cat_cb", None), getattr(self, "bcat_cb", None)) if cb]
+
+    def _add_combo_items(self, combos, values):
+        for cb in combos:
+            current = cb.currentText()
+            items = [cb.itemText(i) for i in range(cb.count())]
+            for value in sorted(set(values) - set(items)):
+                pos = bisect_left(items, value)
+                items.insert(pos, value)
+                cb.insertItem(pos, value)
+            if cb.isEditable():
+                cb.setCurrentText(current)
+
+    def _remove_combo_items(self, combos, values):
+        for cb in combos:
+            for value in values:
+                idx = cb.findText(value)
+                if idx >= 0:
+                    cb.removeItem(idx)
+
+    def _ours(self, db):
+        return db is None or same_db(db, get_db())
+
+    def _on_transactions_added(self, rows, db=None):
+        if not self._ours(db):
+            return
+        self.tr_model.rows_added(rows)
+        self._add_combo_items(self._month_combos(), {str(r["date"])[:7] for r in rows})
+        self._add_combo_items(self._category_combos(), {r["category"] for r in rows})
+
+    def _on_transactions_removed(self, rows, db=None):
+        if not self._ours(db):
+            return
+        self.tr_model.rows_removed([r["id"] for r in rows])
+        months = {str(r["date"])[:7] for r in rows}
+        self._remove_combo_items(self._month_combos(), [m for m in months if not get_db().has_month(m)])
+        cats = {r["category"] for r in rows}
+        self._remove_combo_items(self._category_combos(), [c for c in cats if not get_db().has_category(c)])
+
+    def _on_budgets_changed(self, category, db=None, **_):
+        if not self._ours(db):
+            return
+        self._refresh_budgets()
+        if get_db().has_category(category):
+            self._add_combo_items(self._category_combos(), [category])
+        else:
+            self._remove_combo_items(self._category_combos(), [category])
+
+    def _on_budget_alert(self, category, month, spent, limit, threshold):
+        self.statusBar().showMessage(
+            f"Budget alert: {category} has used {spent / limit:.0%} of its "
+            f"{limit:.2f} budget for {month} (threshold {threshold:.0%})", 15000
+        )
+
     # Transactions Tab
     def _make_transactions_tab(self):
         w = QWidget()
@@ -135,7 +463,7 @@ class MainWindow(QMainWindow):
         form.addRow("Description", self.desc_cb)
         form.addRow("", btn_add)
 
-        self.tr_model = PandasModel()
+        self.tr_model = TransactionTableModel(get_db())
         self.tr_table = QTableView()
         self.tr_table.setModel(self.tr_model)
         btn_del = QPushButton("Delete Selected")
@@ -176,27 +504,20 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Success", f"{typ.capitalize()} recorded.")
             self.amt_spin.setValue(0)
             self.desc_cb.setCurrentText("")
-            self._refresh_transactions()
-            self._update_categories()
-            self._update_months()
         except Exception as e:
             self._show_error(str(e))
 
     def _refresh_transactions(self):
-        df = get_transactions()
-        self.tr_model.update(df)
+        self.tr_model.reload()
 
     def _delete_transaction(self):
         try:
             row = self.tr_table.currentIndex().row()
             if row < 0:
                 return
-            tx_id = int(self.tr_model._df.iloc[row]["id"])
+            tx_id = self.tr_model.row_id(row)
             ok = remove_transaction(tx_id)
             QMessageBox.information(self, "Deleted", f"Deleted={ok}")
-            self._refresh_transactions()
-            self._update_categories()
-            self._update_months()
         except Exception as e:
             self._show_error(str(e))
 
@@ -245,8 +566,6 @@ class MainWindow(QMainWindow):
             set_category_budget(cat, lim)
             QMessageBox.information(self, "Success", "Budget set.")
             self.blim_spin.setValue(0)
-            self._refresh_budgets()
-            self._update_categories()
         except Exception as e:
             self._show_error(str(e))
 
@@ -258,8 +577,6 @@ class MainWindow(QMainWindow):
             cat = self.b_model._df.iloc[row]["category"]
             ok = remove_category_budget(cat)
             QMessageBox.information(self, "Removed", f"Removed={ok}")
-            self._refresh_budgets()
-            self._update_categories()
         except Exception as e:
             self._show_error(str(e))
 
@@ -297,28 +614,21 @@ class MainWindow(QMainWindow):
         return w
 
     def _show_monthly_report(self):
-        try:
-            month = self.rmonth_cb.currentText()
-            rep = generate_monthly_report(month)
-            self.r_model.update(pd.DataFrame([rep]))
-        except Exception as e:
-            self._show_error(str(e))
+        month = self.rmonth_cb.currentText()
+        if month:
+            self._report_runner.submit(
+                lambda: pd.DataFrame([generate_monthly_report(month)]), self.r_model.update
+            )
 
     def _show_category_report(self):
-        try:
-            month = self.rmonth_cb.currentText()
-            df = generate_category_report(month)
-            self.r_model.update(df)
-        except Exception as e:
-            self._show_error(str(e))
+        month = self.rmonth_cb.currentText()
+        if month:
+            self._report_runner.submit(lambda: generate_category_report(month), self.r_model.update)
 
     def _show_budget_report(self):
-        try:
-            month = self.rmonth_cb.currentText()
-            df = generate_budget_report(month)
-            self.r_model.update(df)
-        except Exception as e:
-            self._show_error(str(e))
+        month = self.rmonth_cb.currentText()
+        if month:
+            self._report_runner.submit(lambda: generate_budget_report(month), self.r_model.update)
 
     # Visualization Tab
     def _make_visual_tab(self):
@@ -327,7 +637,7 @@ class MainWindow(QMainWindow):
         ctrl = QHBoxLayout()
 
         self.vmonth_cb = QComboBox()
-        self.vmonth_cb.currentIndexChanged.connect(self._plot_summary)
+        self.vmonth_cb.currentIndexChanged.connect(self._on_vmonth_changed)
         ctrl.addWidget(QLabel("Month"))
         ctrl.addWidget(self.vmonth_cb)
 
@@ -345,85 +655,112 @@ class MainWindow(QMainWindow):
         ctrl.addWidget(btn3)
         ctrl.addWidget(btn4)
 
-        self.canvas = FigureCanvas(plt.figure(figsize=(6, 4)))
+        # The chart canvas is created by _figure() on first draw
+        self.canvas = None
+        self._visual_layout = layout
         layout.addLayout(ctrl)
-        layout.addWidget(self.canvas)
         w.setLayout(layout)
 
         return w
 
+    def _figure(self):
+        if self.canvas is None:
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+            self.canvas = FigureCanvas(Figure(figsize=(6, 4)))
+            self._visual_layout.addWidget(self.canvas)
+        fig = self.canvas.figure
+        fig.clear()
+        return fig
+
+    def _on_tab_changed(self, index):
+        if self._tabs.widget(index) is self._visual_tab and self.canvas is None:
+            self._plot_summary()
+
+    def _on_vmonth_changed(self):
+        # Only redraw while charts are on screen; otherwise wait for the tab to open
+        if self._tabs.currentWidget() is self._visual_tab:
+            self._plot_summary()
+
+    # Report data is computed on the thread pool; the _draw_* callbacks run on the UI thread.
     def _plot_summary(self):
-        try:
-            month = self.vmonth_cb.currentText()
-            rep = generate_monthly_report(month)
-            fig = self.canvas.figure
-            fig.clear()
-            ax = fig.add_subplot(111)
-            sns.barplot(
-                x=["Income", "Expense"],
-                y=[rep["income"], abs(rep["expense"])],
-                palette=["#4caf50", "#f44336"],
-                ax=ax
+        month = self.vmonth_cb.currentText()
+        if month:
+            self._plot_runner.submit(
+                lambda: generate_monthly_report(month), lambda rep: self._draw_summary(month, rep)
             )
-            ax.set_title(f"Summary {month}")
-            self.canvas.draw()
-        except Exception as e:
-            self._show_error(str(e))
+
+    def _draw_summary(self, month, rep):
+        fig = self._figure()
+        ax = fig.add_subplot(111)
+        _seaborn().barplot(
+            x=["Income", "Expense"],
+            y=[rep["income"], abs(rep["expense"])],
+            palette=["#4caf50", "#f44336"],
+            ax=ax
+        )
+        ax.set_title(f"Summary {month}")
+        self.canvas.draw()
 
     def _plot_category(self):
-        try:
-            month = self.vmonth_cb.currentText()
+        month = self.vmonth_cb.currentText()
+        if not month:
+            return
+
+        def compute():
             df = generate_category_report(month)
-            df = df[df["expense"] < 0]
-            fig = self.canvas.figure
-            fig.clear()
-            ax = fig.add_subplot(111)
-            if df.empty:
-                raise ValueError("No expenses to plot.")
-            ax.pie(-df["expense"], labels=df["category"], autopct="%1.1f%%")
-            ax.set_title(f"Category {month}")
-            self.canvas.draw()
-        except Exception as e:
-            self._show_error(str(e))
+            return df[df["expense"] < 0]
+        self._plot_runner.submit(compute, lambda df: self._draw_category(month, df))
+
+    def _draw_category(self, month, df):
+        fig = self._figure()
+        ax = fig.add_subplot(111)
+        if df.empty:
+            raise ValueError("No expenses to plot.")
+        ax.pie(-df["expense"], labels=df["category"], autopct="%1.1f%%")
+        ax.set_title(f"Category {month}")
+        self.canvas.draw()
 
     def _plot_budget(self):
-        try:
-            month = self.vmonth_cb.currentText()
-            df = generate_budget_report(month)
-            fig = self.canvas.figure
-            fig.clear()
-            ax = fig.add_subplot(111)
-            if df.empty:
-                raise ValueError("No budget data.")
-            df = df.sort_values("remaining")
-            sns.barplot(x="remaining", y="category", data=df, palette="Blues_d", ax=ax)
-            ax.set_title(f"Remaining {month}")
-            self.canvas.draw()
-        except Exception as e:
-            self._show_error(str(e))
+        month = self.vmonth_cb.currentText()
+        if month:
+            self._plot_runner.submit(
+                lambda: generate_budget_report(month).sort_values("remaining"),
+                lambda df: self._draw_budget(month, df)
+            )
+
+    def _draw_budget(self, month, df):
+        fig = self._figure()
+        ax = fig.add_subplot(111)
+        if df.empty:
+            raise ValueError("No budget data.")
+        _seaborn().barplot(x="remaining", y="category", data=df, palette="Blues_d", ax=ax)
+        ax.set_title(f"Remaining {month}")
+        self.canvas.draw()
 
     def _plot_trend(self):
-        try:
-            year = self.vmonth_cb.currentText()[:4]
-            df = get_monthly_trend(year)
-            fig = self.canvas.figure
-            fig.clear()
-            ax = fig.add_subplot(111)
-            if df.empty:
-                raise ValueError("No trend data.")
-            df_m = df.melt(
+        year = self.vmonth_cb.currentText()[:4]
+        if not year:
+            return
+
+        def compute():
+            return get_monthly_trend(year).melt(
                 id_vars=["month"],
                 value_vars=["income", "expense", "net"],
                 var_name="variable",
                 value_name="value"
             )
-            sns.lineplot(data=df_m, x="month", y="value", hue="variable", marker="o", ax=ax)
-            ax.set_title(f"Trend {year}")
-            ax.tick_params(axis="x", rotation=45)
-            self.canvas.draw()
-        except Exception as e:
-            self._show_error(str(e))
-
+        self._plot_runner.submit(compute, lambda df_m: self._draw_trend(year, df_m))
+
+    def _draw_trend(self, year, df_m):
+        fig = self._figure()
+        ax = fig.add_subplot(111)
+        if df_m.empty:
+            raise ValueError("No trend data.")
+        _seaborn().lineplot(data=df_m, x="month", y="value", hue="variable", marker="o", ax=ax)
+        ax.set_title(f"Trend {year}")
+        ax.tick_params(axis="x", rotation=45)
+        self.canvas.draw()
 
 if __name__ == "__main__":
     Path("data").mkdir(exist_ok=True)
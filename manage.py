@@ -0,0 +1,125 @@
+# manage.py – Maintenance commands for the Smart Expense Tracker database.
+
+import argparse
+import sys
+
+from database import ExpenseDatabase
+
+def cmd_migrate(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    print(f"Schema version {db.schema_version()}")
+    return 0
+
+def cmd_rebuild_rollup(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    db.rebuild_rollup()
+    print("monthly_category_totals rebuilt.")
+    return 0
+
+def cmd_check_rollup(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    mismatches = db.check_rollup()
+    if mismatches.empty:
+        print("monthly_category_totals is consistent.")
+        return 0
+    print(mismatches.to_string(index=False))
+    unbucketed = int(mismatches["month"].isna().sum())
+    if unbucketed:
+        print(f"{unbucketed} row(s) have dates the rollup cannot bucket; fix their dates "
+              "in transactions or quarantined_transactions.")
+    if len(mismatches) > unbucketed:
+        print(f"{len(mismatches) - unbucketed} inconsistent row(s); run 'rebuild-rollup' to fix.")
+    return 1
+
+def cmd_export(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    export = {"csv": db.export_to_csv, "parquet": db.export_parquet, "arrow": db.export_arrow}
+    written = export[args.format](args.path, start_date=args.start, end_date=args.end,
+                                  category=args.category)
+    print(f"Exported {written} transaction(s) to {args.path} ({args.format}).")
+    return 0
+
+def cmd_import(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    load = {"parquet": db.import_parquet, "arrow": db.import_arrow}
+    count = load[args.format](args.path, replace=args.replace)
+    print(f"Imported {count} transaction(s) from {args.path} ({args.format}).")
+    return 0
+
+def cmd_import_statement(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    from core.importer import ImportConfig, import_statement
+    config = ImportConfig.from_json(args.config) if args.config else ImportConfig()
+    result = import_statement(args.path, config, db, chunk_size=args.chunk_size,
+                              workers=args.workers)
+    for n, reason in result["errors"]:
+        print(f"rejected: {reason}")
+    print(f"{result['read']} row(s) read in {result['seconds']:.2f}s "
+          f"({result['rows_per_sec']:,.0f} rows/s): {result['inserted']} inserted, "
+          f"{result['duplicates']} duplicate(s) skipped, {result['rejected']} rejected.")
+    return 1 if result["rejected"] else 0
+
+def cmd_charts(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    from vis import CHARTS, render_chart_pack
+    written = render_chart_pack(args.out, args.start, args.end, charts=args.chart or CHARTS,
+                                formats=args.format or ["png"], workers=args.workers, db=db)
+    print(f"Wrote {len(written)} chart(s) to {args.out}.")
+    return 0
+
+def cmd_ledgers(db: ExpenseDatabase, args: argparse.Namespace) -> int:
+    from core.ledgers import ledgers
+    if args.register:
+        path = ledgers.register(args.register, args.path)
+        print(f"Registered ledger {args.register} at {path}.")
+        return 0
+    for ledger_id in ledgers.ids():
+        print(f"{ledger_id}\t{ledgers.path(ledger_id)}")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Expense database maintenance")
+    parser.add_argument("--db", default="resources/data.db", help="database file")
+    parser.add_argument("--ledger", help="use this ledger's database instead of --db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="apply pending schema migrations").set_defaults(func=cmd_migrate)
+    sub.add_parser("rebuild-rollup", help="recompute the monthly category rollup") \
+        .set_defaults(func=cmd_rebuild_rollup)
+    sub.add_parser("check-rollup", help="verify the rollup against raw transactions") \
+        .set_defaults(func=cmd_check_rollup)
+    export = sub.add_parser("export", help="export transactions (and budgets for parquet/arrow)")
+    export.add_argument("path", help="CSV file, or directory for parquet/arrow")
+    export.add_argument("--format", choices=["csv", "parquet", "arrow"], default="parquet")
+    export.add_argument("--start", help="first date, YYYY-MM-DD")
+    export.add_argument("--end", help="last date, YYYY-MM-DD")
+    export.add_argument("--category", action="append", help="only this category (repeatable)")
+    export.set_defaults(func=cmd_export)
+    load = sub.add_parser("import", help="import a parquet/arrow export directory")
+    load.add_argument("path", help="directory written by 'export'")
+    load.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    load.add_argument("--replace", action="store_true",
+                      help="replace all transactions and budgets, keeping transaction IDs")
+    load.set_defaults(func=cmd_import)
+    statement = sub.add_parser("import-statement", help="import a CSV bank statement")
+    statement.add_argument("path", help="CSV file with a header row")
+    statement.add_argument("--config", help="JSON column mapping (see core.importer.ImportConfig)")
+    statement.add_argument("--chunk-size", type=int, default=20000, help="records per parse chunk")
+    statement.add_argument("--workers", type=int, help="parser processes (default: CPU count)")
+    statement.set_defaults(func=cmd_import_statement)
+    charts = sub.add_parser("charts", help="render a chart pack for a range of months (headless)")
+    charts.add_argument("out", help="output directory")
+    charts.add_argument("--start", required=True, help="first month, YYYY-MM")
+    charts.add_argument("--end", required=True, help="last month, YYYY-MM")
+    charts.add_argument("--chart", action="append", choices=["summary", "category", "budget", "trend"],
+                        help="chart to render (repeatable; default: all)")
+    charts.add_argument("--format", action="append", choices=["png", "svg", "pdf"],
+                        help="output format (repeatable; default: png)")
+    charts.add_argument("--workers", type=int, default=1, help="rendering processes")
+    charts.set_defaults(func=cmd_charts)
+    ledger = sub.add_parser("ledgers", help="list ledgers, or register one")
+    ledger.add_argument("--register", metavar="ID", help="ledger ID to register")
+    ledger.add_argument("--path", help="database file for --register (default: resources/ledgers/<ID>.db)")
+    ledger.set_defaults(func=cmd_ledgers)
+    args = parser.parse_args()
+    if args.ledger:
+        from core.ledgers import ledgers
+        db = ledgers.open(args.ledger)
+    else:
+        db = ExpenseDatabase(args.db)
+    return args.func(db, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+import re
+import sqlite3
+from datetime import date
+from typing import Callable, List, Optional, Tuple
+
+# Each migration runs once, in its own transaction, and is recorded in
+# schema_version. Never edit a released migration; append a new one.
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+def _initial_schema(conn: sqlite3.Connection) -> None:
+    # IF NOT EXISTS so databases created before versioning are adopted as-is.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            type TEXT CHECK(type IN ('income','expense'))
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS budgets (
+            category TEXT PRIMARY KEY,
+            monthly_limit REAL NOT NULL
+        )
+    """)
+
+def _transaction_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date "
+                 "ON transactions(date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_date_category "
+                 "ON transactions(type, date, category)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_category_date "
+                 "ON transactions(category, date)")
+
+def rollup_rebuild_sql(source: str = "ledger") -> Tuple[str, ...]:
+    """
+    Statements that repopulate monthly_category_totals from `source`, a table
+    or view exposing date, amount, category (name) and type.
+    """
+    return (
+        "DELETE FROM monthly_category_totals",
+        f"""
+        INSERT INTO monthly_category_totals(month, category, type, total, count)
+        SELECT strftime('%Y-%m', date), category, type, SUM(amount), COUNT(*)
+        FROM {source} WHERE type IN ('income','expense')
+          AND strftime('%Y-%m', date) IS NOT NULL  -- see ExpenseDatabase.check_rollup
+        GROUP BY 1, 2, 3
+        """,
+    )
+
+def _create_rollup_triggers(conn: sqlite3.Connection, category_column: str,
+                            new_category: str, old_category: str) -> None:
+    """
+    (Re)create the triggers that keep monthly_category_totals in step with
+    transactions. new_category/old_category are SQL expressions for the
+    category name of the NEW/OLD row.
+    """
+    add = f"""
+        INSERT INTO monthly_category_totals(month, category, type, total, count)
+        VALUES(strftime('%Y-%m', NEW.date), {new_category}, NEW.type, NEW.amount, 1)
+        ON CONFLICT(month, category, type) DO UPDATE
+          SET total = total + excluded.total, count = count + 1;
+    """
+    remove = f"""
+        UPDATE monthly_category_totals
+          SET total = total - OLD.amount, count = count - 1
+          WHERE month = strftime('%Y-%m', OLD.date)
+            AND category = {old_category} AND type = OLD.type;
+        DELETE FROM monthly_category_totals
+          WHERE month = strftime('%Y-%m', OLD.date)
+            AND category = {old_category} AND type = OLD.type AND count <= 0;
+    """
+    columns = f"date, amount, {category_column}, type"
+    for name in ("trg_rollup_insert", "trg_rollup_delete",
+                 "trg_rollup_update_old", "trg_rollup_update_new"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute(f"""
+        CREATE TRIGGER trg_rollup_insert AFTER INSERT ON transactions
+        WHEN NEW.type IN ('income','expense')
+        BEGIN {add} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_rollup_delete AFTER DELETE ON transactions
+        WHEN OLD.type IN ('income','expense')
+        BEGIN {remove} END
+    """)
+    # Split into two triggers so each side is skipped for rows outside the rollup.
+    conn.execute(f"""
+        CREATE TRIGGER trg_rollup_update_old
+        AFTER UPDATE OF {columns} ON transactions
+        WHEN OLD.type IN ('income','expense')
+        BEGIN {remove} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_rollup_update_new
+        AFTER UPDATE OF {columns} ON transactions
+        WHEN NEW.type IN ('income','expense')
+        BEGIN {add} END
+    """)
+
+_LEGACY_DATE = re.compile(r"\s*(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[T ].*)?\s*")
+
+def _normalize_legacy_dates(conn: sqlite3.Connection) -> None:
+    """
+    Rewrite dates that are not canonical YYYY-MM-DD ('2025-6-5', '2025/06/05',
+    '2025-06-05 10:00') to that form. Rows whose date is not a real calendar
+    date are moved to quarantined_transactions with the reason.
+    """
+    rows = conn.execute(
+        # '+0 days' normalizes overflowing days, so '2025-02-30' is caught too.
+        "SELECT id, date FROM transactions WHERE date IS NOT date(date, '+0 days')"
+    ).fetchall()
+    fixed, bad = [], []
+    for id_, value in rows:
+        match = _LEGACY_DATE.fullmatch(str(value))
+        try:
+            fixed.append((date(*map(int, match.groups())).isoformat(), id_))
+        except (AttributeError, ValueError):
+            bad.append((id_,))
+    conn.executemany("UPDATE transactions SET date = ? WHERE id = ?", fixed)
+    if bad:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS quarantined_transactions (
+                id INTEGER PRIMARY KEY,
+                date TEXT,
+                amount REAL,
+                category TEXT,
+                description TEXT,
+                type TEXT,
+                reason TEXT NOT NULL
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO quarantined_transactions(id, date, amount, category, description, type, reason)
+            SELECT id, date, amount, category, description, type, 'invalid date'
+            FROM transactions WHERE id = ?
+        """, bad)
+        conn.executemany("DELETE FROM transactions WHERE id = ?", bad)
+
+def _monthly_rollup(conn: sqlite3.Connection) -> None:
+    # Dates are bucketed with strftime, which is NULL for legacy formats, so
+    # they are repaired first. Only databases that never got past this
+    # migration can hold such dates: its NOT NULL month rejects them after.
+    _normalize_legacy_dates(conn)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_category_totals (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            type TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, category, type)
+        ) WITHOUT ROWID
+    """)
+    _create_rollup_triggers(conn, "category", "NEW.category", "OLD.category")
+    for sql in rollup_rebuild_sql("transactions"):
+        conn.execute(sql)
+
+def _integer_date_key(conn: sqlite3.Connection) -> None:
+    # Virtual generated column (SQLite >= 3.31): nothing is written per row,
+    # but the indexes store it, so date ranges become integer comparisons.
+    columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(transactions)")]
+    if "date_key" not in columns:
+        conn.execute("""
+            ALTER TABLE transactions ADD COLUMN date_key INTEGER
+            GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', date) AS INTEGER)) VIRTUAL
+        """)
+    conn.execute("DROP INDEX IF EXISTS idx_transactions_date")
+    conn.execute("DROP INDEX IF EXISTS idx_transactions_type_date_category")
+    conn.execute("DROP INDEX IF EXISTS idx_transactions_category_date")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_key "
+                 "ON transactions(date_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_date_key_category "
+                 "ON transactions(type, date_key, category)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_category_date_key "
+                 "ON transactions(category, date_key)")
+
+def _normalize_categories(conn: sqlite3.Connection) -> None:
+    # Category names move to a dictionary table; transactions keep an integer
+    # key. SQLite cannot change a column in place, so the table is rebuilt
+    # with the same ids and AUTOINCREMENT counter.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO categories(name) "
+                 "SELECT DISTINCT category FROM transactions ORDER BY category")
+    seq = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name='transactions'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE transactions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            description TEXT,
+            type TEXT CHECK(type IN ('income','expense')),
+            date_key INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', date) AS INTEGER)) VIRTUAL
+        )
+    """)
+    conn.execute("""
+        INSERT INTO transactions_new(id, date, amount, category_id, description, type)
+        SELECT t.id, t.date, t.amount, c.id, t.description, t.type
+        FROM transactions t JOIN categories c ON c.name = t.category
+        ORDER BY t.id
+    """)
+    conn.execute("DROP TABLE transactions")  # also drops its indexes and triggers
+    conn.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    if seq is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name='transactions'",
+                     (seq[0],))
+    conn.execute("CREATE INDEX idx_transactions_date_key ON transactions(date_key)")
+    conn.execute("CREATE INDEX idx_transactions_type_date_key_category "
+                 "ON transactions(type, date_key, category_id)")
+    conn.execute("CREATE INDEX idx_transactions_category_date_key "
+                 "ON transactions(category_id, date_key)")
+    # Read side: transactions with the category name joined back in.
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS ledger AS
+        SELECT t.id, t.date, t.amount, c.name AS category, t.description, t.type,
+               t.date_key, t.category_id
+        FROM transactions t JOIN categories c ON c.id = t.category_id
+    """)
+    lookup = "(SELECT name FROM categories WHERE id = {}.category_id)"
+    _create_rollup_triggers(conn, "category_id", lookup.format("NEW"), lookup.format("OLD"))
+
+def _rollup_category_index(conn: sqlite3.Connection) -> None:
+    # Budget status looks the rollup up by category (optionally for one
+    # month); the (month, category, type) primary key cannot serve that.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rollup_category_type_month "
+                 "ON monthly_category_totals(category, type, month)")
+
+def _integer_cents(conn: sqlite3.Connection) -> None:
+    # Amounts, rollup totals and budget limits move from REAL to INTEGER
+    # minor units (cents), so sums are exact. Existing values are rounded
+    # half away from zero by ROUND(). Both tables are rebuilt to change the
+    # column type; transactions keeps its ids and AUTOINCREMENT counter.
+    seq = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name='transactions'"
+    ).fetchone()
+    conn.execute("DROP VIEW IF EXISTS ledger")  # renaming a table re-checks dependent views
+    conn.execute("""
+        CREATE TABLE transactions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            description TEXT,
+            type TEXT CHECK(type IN ('income','expense')),
+            date_key INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%Y%m%d', date) AS INTEGER)) VIRTUAL
+        )
+    """)
+    conn.execute("""
+        INSERT INTO transactions_new(id, date, amount, category_id, description, type)
+        SELECT id, date, CAST(ROUND(amount * 100) AS INTEGER), category_id, description, type
+        FROM transactions ORDER BY id
+    """)
+    conn.execute("DROP TABLE transactions")
+    conn.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    if seq is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name='transactions'",
+                     (seq[0],))
+    conn.execute("CREATE INDEX idx_transactions_date_key ON transactions(date_key)")
+    conn.execute("CREATE INDEX idx_transactions_type_date_key_category "
+                 "ON transactions(type, date_key, category_id)")
+    conn.execute("CREATE INDEX idx_transactions_category_date_key "
+                 "ON transactions(category_id, date_key)")
+    conn.execute("""
+        CREATE VIEW ledger AS
+        SELECT t.id, t.date, t.amount, c.name AS category, t.description, t.type,
+               t.date_key, t.category_id
+        FROM transactions t JOIN categories c ON c.id = t.category_id
+    """)
+    conn.execute("""
+        CREATE TABLE budgets_new (
+            category TEXT PRIMARY KEY,
+            monthly_limit INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO budgets_new(category, monthly_limit) "
+                 "SELECT category, CAST(ROUND(monthly_limit * 100) AS INTEGER) FROM budgets "
+                 "ORDER BY rowid")
+    conn.execute("DROP TABLE budgets")
+    conn.execute("ALTER TABLE budgets_new RENAME TO budgets")
+    conn.execute("DROP TABLE monthly_category_totals")
+    conn.execute("""
+        CREATE TABLE monthly_category_totals (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            type TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, category, type)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_rollup_category_type_month "
+                 "ON monthly_category_totals(category, type, month)")
+    lookup = "(SELECT name FROM categories WHERE id = {}.category_id)"
+    _create_rollup_triggers(conn, "category_id", lookup.format("NEW"), lookup.format("OLD"))
+    # Totals are recomputed from the rounded amounts rather than rounded themselves.
+    for sql in rollup_rebuild_sql():
+        conn.execute(sql)
+
+MIGRATIONS: List[Migration] = [
+    (1, "initial schema", _initial_schema),
+    (2, "transaction indexes", _transaction_indexes),
+    (3, "monthly category rollup", _monthly_rollup),
+    (4, "integer date_key column", _integer_date_key),
+    (5, "category dictionary table", _normalize_categories),
+    (6, "rollup category index", _rollup_category_index),
+    (7, "integer cents amounts", _integer_cents),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return the applied schema version, 0 for an unversioned database."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'"
+    ).fetchone()
+    if not exists:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """
+    Apply pending migrations up to target (default: latest) and return the
+    resulting version. Safe to call concurrently from several processes.
+    """
+    target = LATEST_VERSION if target is None else target
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    current = schema_version(conn)
+    if current > LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this code "
+            f"supports ({LATEST_VERSION})"
+        )
+    for version, description, apply in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock.
+            if schema_version(conn) < version:
+                apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_version(version, description) VALUES(?,?)",
+                    (version, description)
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        current = version
+    return current
@@ -4,7 +4,7 @@ import os
 from pathlib import Path
 import pandas as pd
 
-from database import ExpenseDatabase
+from database import get_db
 from core.tracker import add_expense, add_income, get_transactions, remove_transaction
 from core.budget import (
     set_category_budget,
@@ -14,6 +14,7 @@ from core.budget import (
     check_budget,
     budget_alerts
 )
+from core.alerts import BudgetAlertEngine
 from core.reports import (
     generate_monthly_report,
     generate_category_report,
@@ -37,7 +38,7 @@ def reset_test_environment():
     and remove old CSV export.
     """
     print("🔄 Resetting test environment...")
-    db = ExpenseDatabase()
+    db = get_db()
     db.clear_all()  
     print("All tables cleared.")
     if os.path.exists(EXPORT_CSV):
@@ -62,12 +63,19 @@ Please select an option:
 11. Category report
 12. Budget report
 13. Yearly trend report
+14. List months
+15. List categories
 0. Exit
 """)
 
 def main():
     reset_test_environment()
-    db = ExpenseDatabase()
+    db = get_db()
+    alerts = BudgetAlertEngine(db).start()
+    alerts.on_alert(lambda category, month, spent, limit, threshold: print(
+        f"⚠️  {category} reached {threshold:.0%} of its {month} budget "
+        f"({spent:.2f} of {limit:.2f})"
+    ))
     while True:
         menu()
         choice = input("Enter choice: ").strip()
@@ -130,6 +138,12 @@ def main():
                 year = input("Year (YYYY): ").strip()
                 df = get_monthly_trend(year)
                 print_table(df, f"Trend for {year}")
+            elif choice == "14":
+                months = db.list_months()
+                print("\n".join(months) if months else "No data")
+            elif choice == "15":
+                cats = db.list_categories()
+                print("\n".join(cats) if cats else "No data")
             else:
                 print("Invalid choice, try again.")
         except Exception as e:
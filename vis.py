@@ -1,6 +1,11 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
 import pandas as pd
+from database import from_cents, to_cents
+from core.ledgers import DbArg, resolve_db
+from core.periods import month_range, parse_month, year_months
 from core.reports import (
     generate_monthly_report,
     generate_category_report,
@@ -8,10 +13,17 @@ from core.reports import (
     get_monthly_trend
 )
 
+def _plotting():
+    """Import pyplot and seaborn on first use; together they take about a second."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
 def plot_monthly_summary(month: str) -> None:
     """
     Bar chart showing income vs expense for a given month.
     """
+    plt, sns = _plotting()
     report = generate_monthly_report(month)
     data = {"Income": report["income"], "Expense": abs(report["expense"])}
     plt.figure(figsize=(6, 4))
@@ -25,6 +37,7 @@ def plot_category_spending(month: str) -> None:
     """
     Pie chart showing spending distribution by category.
     """
+    plt, sns = _plotting()
     df = generate_category_report(month)
     expense_df = df[df["expense"] < 0]
     if expense_df.empty:
@@ -43,6 +56,7 @@ def plot_budget_status(month: str) -> None:
     """
     Horizontal bar chart comparing budget vs actual spending.
     """
+    plt, sns = _plotting()
     df = generate_budget_report(month)
     if df.empty:
         print("No budget data to plot.")
@@ -63,6 +77,7 @@ def plot_monthly_trend(year: str) -> None:
     """
     Line chart showing income, expense, and net over the months in the year.
     """
+    plt, sns = _plotting()
     df = get_monthly_trend(year)
     if df.empty:
         print("No trend data to plot.")
@@ -76,4 +91,171 @@ def plot_monthly_trend(year: str) -> None:
     plt.title(f"Monthly Financial Trend - {year}")
     plt.tight_layout()
     plt.legend()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+# Headless batch rendering. Charts are drawn with matplotlib's object API on
+# Agg canvases, so no display, pyplot state or seaborn is involved.
+
+CHARTS = ("summary", "category", "budget", "trend")
+_FIGSIZES = {"summary": (6, 4), "category": (7, 7), "budget": (8, 5), "trend": (10, 5)}
+
+Job = Tuple[str, str]  # ("month", "YYYY-MM") or ("year", "YYYY")
+
+def load_chart_data(start_month: str, end_month: str,
+                    db: DbArg = None) -> Dict[str, pd.DataFrame]:
+    """
+    Everything a chart pack for start_month..end_month needs, in two queries:
+    per month and category totals covering the whole years (for the trend
+    charts), and the budgets.
+    """
+    parse_month(start_month)
+    parse_month(end_month)
+    db = resolve_db(db)
+    first, _ = year_months(start_month)
+    _, last = year_months(end_month)
+    return {"totals": db.category_month_totals(first, last), "budgets": db.get_budgets()}
+
+class ChartRenderer:
+    """
+    Renders the summary, category, budget and trend charts from one
+    load_chart_data() dataset. Each chart type keeps a single Figure and Axes
+    that are cleared and redrawn for every month, rather than rebuilt.
+    """
+    def __init__(self, data: Dict[str, pd.DataFrame], dpi: int = 100):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        self.dpi = dpi
+        self.budgets = data["budgets"]
+        totals = data["totals"]
+        self.by_month = {m: df for m, df in totals.groupby("month", sort=False)}
+        cents = totals.assign(income=to_cents(totals["income"]), expense=to_cents(totals["expense"]))
+        monthly = cents.groupby("month")[["income", "expense"]].sum()
+        monthly["net"] = monthly["income"] + monthly["expense"]
+        self.monthly = from_cents(monthly)
+        self.axes = {}
+        self._laid_out = set()
+        for chart, size in _FIGSIZES.items():
+            fig = Figure(figsize=size)
+            FigureCanvasAgg(fig)
+            self.axes[chart] = fig.add_subplot(111)
+
+    def _month(self, month: str) -> pd.DataFrame:
+        empty = pd.DataFrame(columns=["month", "category", "income", "expense"])
+        return self.by_month.get(month, empty)
+
+    def draw_summary(self, month: str) -> bool:
+        ax = self.axes["summary"]
+        ax.clear()
+        totals = self._month(month)
+        ax.bar(["Income", "Expense"],
+               [totals["income"].sum(), abs(totals["expense"].sum())],
+               color=["#3b528b", "#5ec962"])
+        ax.set_ylabel("Amount (USD)")
+        ax.set_title(f"Monthly Summary - {month}")
+        return True
+
+    def draw_category(self, month: str) -> bool:
+        expense = self._month(month)
+        expense = expense[expense["expense"] < 0]
+        if expense.empty:
+            return False
+        ax = self.axes["category"]
+        ax.clear()
+        ax.pie(-expense["expense"], labels=expense["category"], autopct="%1.1f%%", startangle=140)
+        ax.set_title(f"Spending Distribution - {month}")
+        ax.axis("equal")
+        return True
+
+    def draw_budget(self, month: str) -> bool:
+        if self.budgets.empty:
+            return False
+        spent = self._month(month).set_index("category")["expense"]
+        df = self.budgets.assign(
+            spent=-self.budgets["category"].map(spent).fillna(0.0)
+        ).sort_values("spent")
+        ax = self.axes["budget"]
+        ax.clear()
+        ax.barh(df["category"], df["spent"], color="salmon", label="Spent")
+        ax.barh(df["category"], df["monthly_limit"], color="lightgreen", alpha=0.6, label="Budget")
+        ax.set_xlabel("Amount (USD)")
+        ax.set_ylabel("Category")
+        ax.set_title(f"Budget vs Spending - {month}")
+        ax.legend()
+        return True
+
+    def draw_trend(self, year: str) -> bool:
+        start, end = year_months(year)
+        df = self.monthly.loc[start:end]
+        if df.empty:
+            return False
+        ax = self.axes["trend"]
+        ax.clear()
+        for column, label in (("income", "Income"), ("expense", "Expense"), ("net", "Net")):
+            ax.plot(df.index, df[column], marker="o", label=label)
+        ax.tick_params(axis="x", rotation=45)
+        ax.set_ylabel("Amount (USD)")
+        ax.set_title(f"Monthly Financial Trend - {year}")
+        ax.legend()
+        return True
+
+    def render(self, jobs: Sequence[Job], out_dir: str, charts: Sequence[str] = CHARTS,
+               formats: Sequence[str] = ("png",)) -> List[Path]:
+        """
+        Draw and save every requested chart for each job: month jobs write
+        out_dir/YYYY-MM/<chart>.<fmt>, year jobs out_dir/YYYY/trend.<fmt>.
+        Charts without data are skipped. Returns the written paths.
+        """
+        written = []
+        for kind, period in jobs:
+            names = ["trend"] if kind == "year" else [c for c in charts if c != "trend"]
+            for chart in names:
+                if chart not in charts or not getattr(self, f"draw_{chart}")(period):
+                    continue
+                fig = self.axes[chart].figure
+                if chart not in self._laid_out:
+                    # Labels keep their extent from period to period, so the
+                    # margins are fitted once instead of on every save.
+                    fig.tight_layout()
+                    self._laid_out.add(chart)
+                folder = Path(out_dir) / period
+                folder.mkdir(parents=True, exist_ok=True)
+                for fmt in formats:
+                    path = folder / f"{chart}.{fmt}"
+                    fig.savefig(path, dpi=self.dpi)
+                    written.append(path)
+        return written
+
+def _render_jobs(data: Dict[str, pd.DataFrame], jobs: List[Job], out_dir: str,
+                 charts: Sequence[str], formats: Sequence[str], dpi: int) -> List[Path]:
+    # Worker process entry point: one renderer (and one set of figures) per worker.
+    return ChartRenderer(data, dpi).render(jobs, out_dir, charts, formats)
+
+def render_chart_pack(out_dir:     str,
+                      start_month: str,
+                      end_month:   str,
+                      charts:      Sequence[str]=CHARTS,
+                      formats:     Sequence[str]=("png",),
+                      workers:     int=1,
+                      dpi:         int=100,
+                      db:          DbArg=None) -> List[Path]:
+    """
+    Render a chart pack for every month from start_month to end_month
+    without a display: summary, category and budget charts per month and
+    one trend chart per year. The data is loaded once; with workers > 1
+    the months are split across a process pool. Returns the written paths.
+    """
+    unknown = set(charts) - set(CHARTS)
+    if unknown:
+        raise ValueError(f"Unknown chart(s): {sorted(unknown)}")
+    data = load_chart_data(start_month, end_month, db)
+    months = month_range(start_month, end_month)
+    jobs: List[Job] = [("month", m) for m in months]
+    if "trend" in charts:
+        jobs += [("year", y) for y in sorted({m[:4] for m in months})]
+    if workers <= 1:
+        return _render_jobs(data, jobs, out_dir, charts, formats, dpi)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        parts = [pool.submit(_render_jobs, data, jobs[i::workers], out_dir, charts, formats, dpi)
+                 for i in range(min(workers, len(jobs)))]
+        return [path for part in parts for path in part.result()]